@@ -0,0 +1,104 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Union
+
+from cache_house.helpers import expire_seconds
+
+DEFAULT_MIN_TTL = 30
+DEFAULT_MAX_TTL = 3600
+DEFAULT_COST_REFERENCE = 0.1  # seconds of compute that earn the base TTL
+DEFAULT_RATE_REFERENCE = 1.0  # requests per second that earn the base TTL
+DEFAULT_MAX_TRACKED = 10000
+DEFAULT_ALPHA = 0.2
+
+
+class _Stats:
+    __slots__ = ("cost", "rate", "last_seen")
+
+    def __init__(self) -> None:
+        self.cost: Optional[float] = None
+        self.rate: Optional[float] = None
+        self.last_seen: Optional[float] = None
+
+
+class AdaptiveTTL:
+    """TTL policy driven by observed compute cost and access frequency.
+
+    For each tracked name (a function, or each cache key when `per_key` is
+    True) it keeps an EWMA of the compute time and of the request rate. The
+    TTL is the base `expire` scaled by the geometric mean of
+    `cost / cost_reference` and `rate / rate_reference`, clamped to
+    `[min_ttl, max_ttl]`: expensive and hot entries live longer, cheap and
+    cold ones expire sooner. Per-key stats are kept in a bounded LRU of
+    `max_tracked` entries.
+    """
+
+    def __init__(
+        self,
+        min_ttl: Union[timedelta, int] = DEFAULT_MIN_TTL,
+        max_ttl: Union[timedelta, int] = DEFAULT_MAX_TTL,
+        cost_reference: float = DEFAULT_COST_REFERENCE,
+        rate_reference: float = DEFAULT_RATE_REFERENCE,
+        per_key: bool = False,
+        max_tracked: int = DEFAULT_MAX_TRACKED,
+        alpha: float = DEFAULT_ALPHA,
+    ) -> None:
+        self.min_ttl = expire_seconds(min_ttl)
+        self.max_ttl = expire_seconds(max_ttl)
+        self.cost_reference = cost_reference
+        self.rate_reference = rate_reference
+        self.per_key = per_key
+        self.max_tracked = max_tracked
+        self.alpha = alpha
+        self._stats: "OrderedDict[str, _Stats]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> _Stats:
+        # Caller holds the lock
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = _Stats()
+            if len(self._stats) > self.max_tracked:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(name)
+        return stats
+
+    def _ewma(self, previous: Optional[float], sample: float) -> float:
+        if previous is None:
+            return sample
+        return previous + self.alpha * (sample - previous)
+
+    def observe_access(self, name: str, now: float = None) -> None:
+        """Record one request (hit or miss) for `name`"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            stats = self._get(name)
+            if stats.last_seen is not None:
+                interval = max(now - stats.last_seen, 1e-3)
+                stats.rate = self._ewma(stats.rate, 1.0 / interval)
+            stats.last_seen = now
+
+    def observe_compute(self, name: str, seconds: float) -> None:
+        """Record how long computing the value for `name` took"""
+        with self._lock:
+            stats = self._get(name)
+            stats.cost = self._ewma(stats.cost, seconds)
+
+    def ttl(self, name: str, base: Union[timedelta, int]) -> int:
+        """Return the TTL in seconds to store `name` with"""
+        base_seconds = expire_seconds(base)
+        with self._lock:
+            stats = self._stats.get(name)
+            cost = stats.cost if stats else None
+            rate = stats.rate if stats else None
+
+        cost_factor = (cost / self.cost_reference) if cost is not None else 1.0
+        # Never-repeated names have no rate yet, treat them as cold
+        rate_factor = (rate / self.rate_reference) if rate is not None else 0.0
+        factor = math.sqrt(max(cost_factor, 0.0) * rate_factor)
+        ttl = min(self.max_ttl, max(self.min_ttl, base_seconds * factor))
+        return max(1, int(ttl))
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import contextlib
+import importlib
+import json
 import logging
-from typing import Any, Callable
+import os
+import threading
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional, Union
 
-from redis import Redis
-from redis.exceptions import ConnectionError, RedisError, TimeoutError
-
-from cache_house.backends.redis_backend import RedisCache
-from cache_house.backends.redis_cluster_backend import RedisClusterCache
+from cache_house.backends.compact import CompactLayout
+from cache_house.backends.read_policy import LOWEST_LATENCY, PRIMARY, ROUND_ROBIN
+from cache_house.backends.write_behind import DROP_NEWEST, DROP_OLDEST, WriteBehindQueue
 from cache_house.helpers import (
     DEFAULT_NAMESPACE,
     DEFAULT_PREFIX,
@@ -17,12 +20,45 @@ from cache_house.helpers import (
     pickle_encoder,
 )
 
+if TYPE_CHECKING:
+    from cache_house.backends.redis_backend import RedisCache
+    from cache_house.backends.redis_cluster_backend import RedisClusterCache
+
 log = logging.getLogger(__name__)
 log.setLevel(logging.INFO)
 
+# Backend modules import redis-py, so they are only loaded on first use.
+_LAZY_BACKENDS = {
+    "RedisCache": "cache_house.backends.redis_backend",
+    "RedisClusterCache": "cache_house.backends.redis_cluster_backend",
+}
+
+DEFAULT_BACKEND = "default"
+
+CLUSTER_MODE_ENV = "CACHE_HOUSE_CLUSTER_MODE"
+CLUSTER_HINT_FILE_ENV = "CACHE_HOUSE_CLUSTER_HINT_FILE"
+_CLUSTER_MODE_VALUES = {
+    "cluster": True,
+    "true": True,
+    "1": True,
+    "standalone": False,
+    "false": False,
+    "0": False,
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_BACKENDS:
+        return getattr(importlib.import_module(_LAZY_BACKENDS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class RedisFactory:
+    # The default backend lives in `instance`, named ones in `_backends`
     instance = None
+    _backends: Dict[str, Any] = {}
+    _init_threads: Dict[str, threading.Thread] = {}
+    _init_lock = threading.Lock()
 
     def __init__(
         self,
@@ -46,19 +82,18 @@ class RedisFactory:
         self.redis_kwargs = redis_kwargs
 
     @staticmethod
-    def _is_cluster_enabled(
+    def _probe_cluster(
         host: str,
         port: int,
         password: str | None = None,
         db: int = 0,
         **redis_kwargs: Any,
-    ) -> bool:
-        """
-        Detect whether the target Redis node is part of a Redis Cluster.
+    ) -> Optional[bool]:
+        """Send `CLUSTER INFO` to the node. Returns None if the node was unreachable."""
+        from redis.exceptions import ConnectionError, RedisError, TimeoutError
+
+        from cache_house.backends.redis_backend import Redis
 
-        It sends `CLUSTER INFO` command to the node. Standalone Redis will
-        respond with an error, while cluster nodes will return cluster info.
-        """
         client: Redis | None = None
         try:
             client = Redis(host=host, port=port, password=password, db=db, **redis_kwargs)
@@ -68,19 +103,89 @@ class RedisFactory:
             return True
         except (ConnectionError, TimeoutError) as e:
             log.warning(f"Could not connect to Redis for cluster detection: {e}. Assuming standalone mode.")
-            return False
+            return None
         except RedisError:
             # Connected to Redis but CLUSTER INFO failed - it's standalone
             log.info("Redis standalone mode detected")
             return False
         except Exception as exc:  # pragma: no cover - defensive
             log.warning(f"Failed to auto-detect Redis cluster mode: {exc}")
-            return False
+            return None
         finally:
             if client is not None:
                 with contextlib.suppress(Exception):
                     client.close()
 
+    @staticmethod
+    def _is_cluster_enabled(
+        host: str,
+        port: int,
+        password: str | None = None,
+        db: int = 0,
+        **redis_kwargs: Any,
+    ) -> bool:
+        """
+        Detect whether the target Redis node is part of a Redis Cluster.
+
+        It sends `CLUSTER INFO` command to the node. Standalone Redis will
+        respond with an error, while cluster nodes will return cluster info.
+        """
+        return bool(
+            RedisFactory._probe_cluster(host, port, password=password, db=db, **redis_kwargs)
+        )
+
+    @staticmethod
+    def _read_cluster_hint(host: str, port: int, hint_file: Optional[str]) -> Optional[bool]:
+        """Cluster mode from `CACHE_HOUSE_CLUSTER_MODE` or the hint file, if known"""
+        env_value = os.getenv(CLUSTER_MODE_ENV, "").strip().lower()
+        if env_value in _CLUSTER_MODE_VALUES:
+            return _CLUSTER_MODE_VALUES[env_value]
+        if not hint_file:
+            return None
+        try:
+            with open(hint_file) as fp:
+                hint = json.load(fp).get(f"{host}:{port}")
+        except (OSError, ValueError, AttributeError):
+            return None
+        return hint if isinstance(hint, bool) else None
+
+    @staticmethod
+    def _write_cluster_hint(host: str, port: int, hint_file: str, is_cluster: bool) -> None:
+        try:
+            with open(hint_file) as fp:
+                hints = json.load(fp)
+            if not isinstance(hints, dict):
+                hints = {}
+        except (OSError, ValueError):
+            hints = {}
+        hints[f"{host}:{port}"] = is_cluster
+        tmp_file = f"{hint_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, "w") as fp:
+                json.dump(hints, fp)
+            os.replace(tmp_file, hint_file)
+        except OSError as e:
+            log.warning(f"Could not write cluster hint file {hint_file}: {e}")
+
+    @classmethod
+    def _detect_cluster(
+        cls,
+        host: str,
+        port: int,
+        password: str | None,
+        db: int,
+        hint_file: Optional[str],
+        **redis_kwargs: Any,
+    ) -> bool:
+        hint = cls._read_cluster_hint(host, port, hint_file)
+        if hint is not None:
+            log.info(f"Using cached cluster mode hint for {host}:{port}: cluster={hint}")
+            return hint
+        detected = cls._probe_cluster(host, port, password=password, db=db, **redis_kwargs)
+        if detected is not None and hint_file:
+            cls._write_cluster_hint(host, port, hint_file, detected)
+        return bool(detected)
+
     @classmethod
     def init(
         cls,
@@ -96,6 +201,15 @@ class RedisFactory:
         cluster_mode: bool = False,
         autodetect_cluster: bool = True,
         fallback_to_memory: bool = True,
+        read_policy: str = PRIMARY,
+        write_behind: Union[bool, WriteBehindQueue] = False,
+        background: bool = False,
+        preload_keys: Iterable[str] = None,
+        preload_ttl: Union[timedelta, int] = 60,
+        compact: Union[bool, CompactLayout] = False,
+        cluster_hint_file: Optional[str] = None,
+        fallback_max_entries: Optional[int] = None,
+        name: str = DEFAULT_BACKEND,
         **redis_kwargs,
     ):
         """
@@ -106,24 +220,50 @@ class RedisFactory:
           it will auto-detect whether the target is a Redis Cluster node by
           issuing `CLUSTER INFO` command and choose the appropriate backend.
         - If `autodetect_cluster` is False, always use standalone `RedisCache`.
+
+        `read_policy` controls where cluster reads (`get_key`/`get_many`) are
+        routed: `"primary"`, `"round_robin"` across replicas, or
+        `"lowest_latency"` by EWMA of each node's RTT. Writes always go to
+        primaries and standalone Redis ignores it.
+
+        `write_behind=True` (or a configured `WriteBehindQueue`) makes the
+        decorator return results on a miss without waiting for the SET; writes
+        are batched into pipelines by a background thread.
+
+        `background=True` returns immediately and runs cluster detection and
+        connection setup in a daemon thread; until it finishes the decorator
+        calls functions without caching. `preload_keys` are fetched with one
+        MGET after setup and served from local memory for up to `preload_ttl`.
+
+        `compact=True` (or a configured `CompactLayout`) stores small values as
+        fields of bucketed hashes instead of one string key each.
+
+        Auto-detection costs a round trip on an extra connection. It is skipped
+        when `CACHE_HOUSE_CLUSTER_MODE` is set (`cluster`/`standalone`) or when
+        `cluster_hint_file` (default: `CACHE_HOUSE_CLUSTER_HINT_FILE`) already
+        holds the result of a previous probe for this host and port.
+
+        Passing `name` registers an additional, independent backend (own
+        connection pool, codec and fallback store) that decorators select with
+        `cache(backend=name)`; the unnamed default stays in `RedisFactory.instance`.
+        `fallback_max_entries` caps the in-memory fallback store.
         """
-        if not cls.instance:
+        hint_file = cluster_hint_file or os.getenv(CLUSTER_HINT_FILE_ENV)
+        is_default = name == DEFAULT_BACKEND
+
+        def build():
             try:
                 use_cluster = cluster_mode
                 if not cluster_mode and autodetect_cluster:
-                    if cls._is_cluster_enabled(
-                        host=host,
-                        port=port,
-                        password=password,
-                        db=db,
-                        **redis_kwargs,
-                    ):
+                    if cls._detect_cluster(host, port, password, db, hint_file, **redis_kwargs):
                         use_cluster = True
                         log.info(
                             "Auto-detected Redis Cluster; using RedisClusterCache backend"
                         )
 
                 if use_cluster:
+                    from cache_house.backends.redis_cluster_backend import RedisClusterCache
+
                     backend = RedisClusterCache(
                         host=host,
                         port=port,
@@ -133,10 +273,17 @@ class RedisFactory:
                         key_prefix=key_prefix,
                         key_builder=key_builder,
                         fallback_to_memory=fallback_to_memory,
+                        read_policy=read_policy,
+                        write_behind=write_behind,
+                        compact=compact,
+                        fallback_max_entries=fallback_max_entries,
+                        register_instance=is_default,
                         url=None,
                         **redis_kwargs,
                     )
                 else:
+                    from cache_house.backends.redis_backend import RedisCache
+
                     backend = RedisCache(
                         host=host,
                         port=port,
@@ -148,35 +295,120 @@ class RedisFactory:
                         key_prefix=key_prefix,
                         key_builder=key_builder,
                         fallback_to_memory=fallback_to_memory,
+                        write_behind=write_behind,
+                        compact=compact,
+                        fallback_max_entries=fallback_max_entries,
+                        register_instance=is_default,
                         **redis_kwargs,
                     )
 
-                cls.instance = backend.instance
+                if preload_keys:
+                    backend.preload(list(preload_keys), preload_ttl)
+                if is_default:
+                    cls.instance = backend
+                else:
+                    cls._backends[name] = backend
             except Exception as err:
                 # Handle any unexpected errors during initialization
-                log.error(f"Failed to initialize Redis cache: {err}")
+                log.error(f"Failed to initialize Redis cache {name!r}: {err}")
                 log.warning("Cache operations will be skipped until Redis is available.")
 
+        with cls._init_lock:
+            if cls._lookup(name) is not None or cls._initializing(name):
+                return
+            if background:
+                cls._init_threads[name] = threading.Thread(
+                    target=build, name=f"cache-house-init-{name}", daemon=True
+                )
+                cls._init_threads[name].start()
+            else:
+                build()
+
     @classmethod
-    def get_instance(cls):
-        if cls.instance:
-            return cls.instance
-        log.warning("Redis is not initialized. Cache operations will be skipped.")
+    def _lookup(cls, name: str):
+        return cls.instance if name == DEFAULT_BACKEND else cls._backends.get(name)
+
+    @classmethod
+    def _initializing(cls, name: str) -> bool:
+        thread = cls._init_threads.get(name)
+        return thread is not None and thread.is_alive()
+
+    @classmethod
+    def wait_ready(cls, timeout: float = None, name: str = DEFAULT_BACKEND) -> bool:
+        """Wait for a background `init` to finish. Returns True if a backend is available."""
+        thread = cls._init_threads.get(name)
+        if thread is not None:
+            thread.join(timeout)
+        return cls._lookup(name) is not None
+
+    @classmethod
+    def get_instance(cls, name: str = None):
+        name = name or DEFAULT_BACKEND
+        backend = cls._lookup(name)
+        if backend:
+            return backend
+        if cls._initializing(name):
+            log.debug("Redis is still initializing. Cache operations will be skipped.")
+            return None
+        if name == DEFAULT_BACKEND:
+            log.warning("Redis is not initialized. Cache operations will be skipped.")
+        else:
+            log.warning(
+                f"Cache backend {name!r} is not initialized. Cache operations will be skipped."
+            )
         return None
 
     @classmethod
-    def close_connections(cls):
+    def backends(cls) -> Dict[str, Any]:
+        """All initialized backends by name"""
+        backends = dict(cls._backends)
         if cls.instance:
-            try:
-                cls.instance.redis.close()
-                log.info("close redis connection")
-            except Exception as e:
-                log.warning(f"Error closing Redis connection: {e}")
+            backends[DEFAULT_BACKEND] = cls.instance
+        return backends
+
+    @classmethod
+    def clear_keys(cls, pattern: str, name: str = DEFAULT_BACKEND) -> bool:
+        """Clear keys matching pattern on the named backend"""
+        backend = cls._lookup(name)
+        if backend is None:
+            log.warning(f"Cache backend {name!r} is not initialized")
+            return False
+        return backend.clear_keys(pattern, instance=backend)
+
+    @staticmethod
+    def _close_backend(backend, flush_timeout: float = None):
+        if backend.write_behind is not None:
+            if not backend.write_behind.stop(flush_timeout):
+                log.warning("Write-behind flush timed out, pending cache writes were dropped")
+        try:
+            backend.redis.close()
+            log.info("close redis connection")
+        except Exception as e:
+            log.warning(f"Error closing Redis connection: {e}")
+
+    @classmethod
+    def close_connections(cls, flush_timeout: float = None, name: str = None):
+        """Close the named backend, or every registered backend when `name` is None"""
+        if name is not None:
+            backend = cls._lookup(name)
+            if backend is not None:
+                cls._close_backend(backend, flush_timeout)
+            return
+        for backend in cls.backends().values():
+            cls._close_backend(backend, flush_timeout)
 
 
 __all__ = [
+    "DEFAULT_BACKEND",
     "RedisCache",
     "RedisClusterCache",
+    "PRIMARY",
+    "ROUND_ROBIN",
+    "LOWEST_LATENCY",
+    "WriteBehindQueue",
+    "CompactLayout",
+    "DROP_NEWEST",
+    "DROP_OLDEST",
     "DEFAULT_NAMESPACE",
     "DEFAULT_PREFIX",
     "key_builder",
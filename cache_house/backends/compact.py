@@ -0,0 +1,63 @@
+import hashlib
+import struct
+import time
+from datetime import timedelta
+from typing import Any, Optional, Tuple, Union
+
+from cache_house.helpers import expire_seconds
+
+DEFAULT_BUCKETS = 65536
+# Redis keeps a hash listpack-encoded while every value is at most
+# `hash-max-listpack-value` bytes (64 by default) and it has at most
+# `hash-max-listpack-entries` fields (128 by default).
+DEFAULT_MAX_VALUE_SIZE = 64
+
+_EXPIRY = struct.Struct(">I")
+
+
+class CompactLayout:
+    """Store small values as fields of bucketed Redis hashes.
+
+    `cachehouse:main::<md5 hex>` becomes field `<12 byte digest>` of hash
+    `cachehouse:main::#<bucket>`, so the bucket keeps the original key's
+    namespace prefix and `clear_keys` keeps working. Each field value carries
+    its absolute expiry so stale fields are ignored even on servers without
+    `HEXPIRE`; where `HEXPIRE` exists the field also expires server side.
+    Values larger than `max_value_size` keep using plain string keys.
+    """
+
+    def __init__(
+        self,
+        buckets: int = DEFAULT_BUCKETS,
+        max_value_size: int = DEFAULT_MAX_VALUE_SIZE,
+    ) -> None:
+        self.buckets = buckets
+        self.max_value_size = max_value_size
+        # Detected on first write: does the server support HEXPIRE?
+        self.field_ttl: Optional[bool] = None
+
+    def locate(self, key: str) -> Tuple[str, bytes]:
+        """Return `(bucket key, field)` for a cache key"""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        bucket = int.from_bytes(digest[:4], "big") % self.buckets
+        namespace = key.rsplit(":", 1)[0] if ":" in key else ""
+        return f"{namespace}:#{bucket:x}", digest[4:]
+
+    def fits(self, encoded_val: Any) -> bool:
+        return len(encoded_val) + _EXPIRY.size <= self.max_value_size
+
+    @staticmethod
+    def pack(encoded_val: Union[bytes, str], exp: Union[timedelta, int]) -> bytes:
+        if isinstance(encoded_val, str):
+            encoded_val = encoded_val.encode()
+        return _EXPIRY.pack(int(time.time() + expire_seconds(exp))) + encoded_val
+
+    @staticmethod
+    def unpack(raw: Optional[bytes]) -> Optional[bytes]:
+        """Return the stored value, or None if it is missing or expired"""
+        if not raw or len(raw) < _EXPIRY.size:
+            return None
+        (expiry,) = _EXPIRY.unpack_from(raw)
+        if time.time() >= expiry:
+            return None
+        return raw[_EXPIRY.size:]
@@ -0,0 +1,104 @@
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from cache_house.helpers import expire_seconds
+
+DEFAULT_STRIPES = 16
+DEFAULT_CLEANUP_THRESHOLD = 1000
+
+
+class StripedMemoryCache:
+    """Expiring in-memory store split into independently locked shards.
+
+    Writers only lock the shard owning the key, so threads touching
+    different keys rarely contend. Reads take no lock on the hit path: a
+    single `dict.get` is atomic both with the GIL and on free-threaded
+    builds, and the lock is only taken to drop an expired entry.
+
+    With `max_entries` set, a shard that is still full after dropping expired
+    entries evicts its oldest insertions, bounding the store's memory.
+    """
+
+    def __init__(
+        self,
+        stripes: int = DEFAULT_STRIPES,
+        cleanup_threshold: int = DEFAULT_CLEANUP_THRESHOLD,
+        max_entries: Optional[int] = None,
+    ) -> None:
+        self._shards: List[Dict[str, Tuple[Any, float]]] = [{} for _ in range(stripes)]
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._shard_threshold = max(1, cleanup_threshold // stripes)
+        self._shard_limit = max(1, max_entries // stripes) if max_entries else None
+
+    def _index(self, key: str) -> int:
+        return hash(key) % len(self._shards)
+
+    def set(self, key: str, val: Any, exp: Union[timedelta, int]) -> None:
+        expiry_time = time.time() + expire_seconds(exp)
+        index = self._index(key)
+        shard = self._shards[index]
+        limit = self._shard_limit
+        with self._locks[index]:
+            if limit is not None:
+                # Re-insert so an updated key counts as the newest entry
+                shard.pop(key, None)
+            shard[key] = (val, expiry_time)
+            # Clean up expired entries periodically
+            if len(shard) > self._shard_threshold or (limit is not None and len(shard) > limit):
+                self._cleanup_shard(shard, time.time())
+            if limit is not None:
+                while len(shard) > limit:
+                    del shard[next(iter(shard))]
+
+    def get(self, key: str) -> Optional[Any]:
+        index = self._index(key)
+        shard = self._shards[index]
+        entry = shard.get(key)
+        if entry is None:
+            return None
+        val, expiry_time = entry
+        if time.time() < expiry_time:
+            return val
+        with self._locks[index]:
+            # Only drop it if nobody replaced the entry in the meantime
+            if shard.get(key) is entry:
+                del shard[key]
+        return None
+
+    def pop(self, key: str) -> Optional[Any]:
+        index = self._index(key)
+        with self._locks[index]:
+            entry = self._shards[index].pop(key, None)
+        return entry[0] if entry else None
+
+    def delete_prefix(self, prefix: str) -> int:
+        deleted = 0
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                keys = [key for key in shard if key.startswith(prefix)]
+                for key in keys:
+                    del shard[key]
+            deleted += len(keys)
+        return deleted
+
+    @staticmethod
+    def _cleanup_shard(shard: Dict[str, Tuple[Any, float]], now: float) -> None:
+        # Caller holds the shard lock
+        expired_keys = [key for key, (_, expiry_time) in shard.items() if now >= expiry_time]
+        for key in expired_keys:
+            del shard[key]
+
+    def cleanup(self) -> None:
+        """Remove expired entries from every shard"""
+        now = time.time()
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                self._cleanup_shard(shard, now)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
@@ -0,0 +1,99 @@
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+PRIMARY = "primary"
+ROUND_ROBIN = "round_robin"
+LOWEST_LATENCY = "lowest_latency"
+
+READ_POLICIES = (PRIMARY, ROUND_ROBIN, LOWEST_LATENCY)
+
+DEFAULT_EWMA_ALPHA = 0.2
+# Penalty (seconds) recorded for a node when a read against it fails, so that
+# latency-aware routing steers away from it until a probe succeeds again.
+FAILURE_PENALTY = 1.0
+# Every Nth lowest-latency read probes the node measured longest ago, so
+# slower or penalised nodes keep an up to date estimate.
+DEFAULT_EXPLORE_INTERVAL = 50
+
+
+def validate_read_policy(policy: str) -> str:
+    if policy not in READ_POLICIES:
+        raise ValueError(f"Unknown read policy {policy!r}, expected one of {READ_POLICIES}")
+    return policy
+
+
+class NodeSelector:
+    """Pick the node to read a slot from according to a read policy.
+
+    `nodes` passed to `select` follow redis-py's slots cache layout: the
+    primary first, followed by its replicas. Writes never go through here.
+    """
+
+    def __init__(
+        self,
+        policy: str = PRIMARY,
+        alpha: float = DEFAULT_EWMA_ALPHA,
+        explore_interval: int = DEFAULT_EXPLORE_INTERVAL,
+    ) -> None:
+        self.policy = validate_read_policy(policy)
+        self.alpha = alpha
+        self.explore_interval = explore_interval
+        self._rtt: Dict[str, float] = {}
+        self._measured_at: Dict[str, float] = {}
+        self._failed = set()
+        self._counters: Dict[str, itertools.count] = {}
+        self._lock = threading.Lock()
+
+    def select(self, nodes: Sequence, policy: Optional[str] = None):
+        policy = validate_read_policy(policy) if policy else self.policy
+        if not nodes:
+            return None
+        replicas = list(nodes[1:])
+        if policy == PRIMARY or not replicas:
+            return nodes[0]
+        if policy == ROUND_ROBIN:
+            return replicas[self._next_index(nodes[0].name, len(replicas))]
+        return self._lowest_latency(list(nodes), nodes[0].name)
+
+    def _next_index(self, primary_name: str, size: int) -> int:
+        counter = self._counters.get(primary_name)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(primary_name, itertools.count())
+        return next(counter) % size
+
+    def _lowest_latency(self, nodes: List, primary_name: str):
+        # Nodes that were never measured get probed first so every node
+        # gets an RTT estimate; afterwards the cheapest node wins, except for
+        # the periodic probe of the stalest estimate.
+        for node in nodes:
+            if node.name not in self._rtt:
+                return node
+        best = min(nodes, key=lambda node: self._rtt.get(node.name, FAILURE_PENALTY))
+        tick = self._next_index(f"{primary_name}:explore", self.explore_interval)
+        if tick == self.explore_interval - 1:
+            others = [node for node in nodes if node is not best]
+            return min(others, key=lambda node: self._measured_at.get(node.name, 0.0))
+        return best
+
+    def record(self, node_name: str, rtt: float) -> None:
+        """Fold an observed round trip time into the node's EWMA."""
+        with self._lock:
+            previous = self._rtt.get(node_name)
+            if previous is None or node_name in self._failed:
+                # A node answering again after a failure starts from a fresh estimate
+                self._rtt[node_name] = rtt
+                self._failed.discard(node_name)
+            else:
+                self._rtt[node_name] = previous + self.alpha * (rtt - previous)
+            self._measured_at[node_name] = time.monotonic()
+
+    def record_failure(self, node_name: str) -> None:
+        self.record(node_name, FAILURE_PENALTY)
+        with self._lock:
+            self._failed.add(node_name)
+
+    def latency(self, node_name: str) -> Optional[float]:
+        return self._rtt.get(node_name)
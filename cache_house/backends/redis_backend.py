@@ -1,28 +1,43 @@
 import logging
 import os
+import threading
 import time
+import uuid
 from datetime import timedelta
-from typing import Any, Callable, Dict, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from redis import Redis
-from redis.exceptions import ConnectionError, RedisError, TimeoutError
+from redis.exceptions import ConnectionError, RedisError, ResponseError, TimeoutError
 
-from cache_house.exceptions import RedisNotInitialized
+from cache_house.backends.compact import CompactLayout
+from cache_house.backends.memory import StripedMemoryCache
+from cache_house.backends.scripts import Scripts, companion_key
+from cache_house.backends.write_behind import WriteBehindQueue
+from cache_house.exceptions import CompactLayoutUnsupported, RedisNotInitialized
 from cache_house.helpers import (
     DEFAULT_NAMESPACE,
     DEFAULT_PREFIX,
+    expire_seconds,
     key_builder,
     pickle_decoder,
     pickle_encoder,
 )
 
+DEFAULT_LOCK_TTL = 10
+
 LOG_LEVEL = os.getenv("CACHE_HOUSE_LOG_LEVEL", logging.INFO)
 log = logging.getLogger("cache_house.backends.redis_backend")
 log.setLevel(LOG_LEVEL)
 
 
+def _milliseconds(exp: Union[timedelta, int]) -> int:
+    """TTL for the Lua scripts, which use PX/PEXPIRE so sub-second TTLs survive"""
+    return max(1, int(expire_seconds(exp) * 1000))
+
+
 class RedisCache:
     instance = None
+    _init_lock = threading.Lock()
 
     def __init__(
         self,
@@ -36,6 +51,10 @@ class RedisCache:
         key_prefix: str = DEFAULT_PREFIX,
         key_builder: Callable[..., Any] = key_builder,
         fallback_to_memory: bool = True,
+        write_behind: Union[bool, WriteBehindQueue] = False,
+        compact: Union[bool, CompactLayout] = False,
+        fallback_max_entries: Optional[int] = None,
+        register_instance: bool = True,
         **kwargs,
     ) -> None:
         self.redis = Redis(
@@ -51,80 +70,331 @@ class RedisCache:
         self.key_prefix = key_prefix
         self.key_builder = key_builder
         self.fallback_to_memory = fallback_to_memory
-        self._memory_cache: Dict[str, tuple] = {}  # key -> (value, expiry_time)
-        RedisCache.instance = self
+        self._memory_cache = StripedMemoryCache(max_entries=fallback_max_entries)
+        self._preloaded: Dict[str, tuple] = {}  # key -> (decoded value, expiry_time)
+        self.compact = self._compact_layout(compact)
+        self._scripts: Optional[Scripts] = None
+        self.write_behind = self._start_write_behind(write_behind)
+        if register_instance:
+            RedisCache.instance = self
         log.info("redis initialized (Redis will handle reconnections automatically)")
 
     def _set_memory_cache(self, key: str, val: Any, exp: Union[timedelta, int]):
         """Store value in in-memory cache with expiration"""
-        if isinstance(exp, timedelta):
-            expiry_time = time.time() + exp.total_seconds()
-        else:
-            expiry_time = time.time() + exp
-        self._memory_cache[key] = (val, expiry_time)
-        # Clean up expired entries periodically
-        if len(self._memory_cache) > 1000:
-            self._cleanup_memory_cache()
+        self._memory_cache.set(key, val, exp)
 
     def _get_memory_cache(self, key: str) -> Optional[Any]:
         """Get value from in-memory cache if not expired"""
-        if key in self._memory_cache:
-            val, expiry_time = self._memory_cache[key]
-            if time.time() < expiry_time:
-                return val
-            else:
-                # Expired, remove it
-                del self._memory_cache[key]
-        return None
+        return self._memory_cache.get(key)
 
     def _cleanup_memory_cache(self):
         """Remove expired entries from memory cache"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, expiry_time) in self._memory_cache.items()
-            if current_time >= expiry_time
-        ]
-        for key in expired_keys:
-            del self._memory_cache[key]
+        self._memory_cache.cleanup()
+
+    def _start_write_behind(
+        self, write_behind: Union[bool, WriteBehindQueue]
+    ) -> Optional[WriteBehindQueue]:
+        if not write_behind:
+            return None
+        queue = WriteBehindQueue() if write_behind is True else write_behind
+        queue.start(self)
+        return queue
+
+    @staticmethod
+    def _compact_layout(compact: Union[bool, CompactLayout]) -> Optional[CompactLayout]:
+        if not compact:
+            return None
+        return CompactLayout() if compact is True else compact
+
+    def _field_ttl_supported(self) -> bool:
+        """Check once whether the server has per-field hash TTL (`HEXPIRE`, Redis 7.4+)"""
+        if self.compact.field_ttl is None:
+            try:
+                self.redis.hexpire(f"{self.key_prefix}:hexpire-probe", 1, "probe")
+                self.compact.field_ttl = True
+            except ResponseError:
+                self.compact.field_ttl = False
+                log.info("HEXPIRE not supported, compact buckets expire as a whole")
+        return self.compact.field_ttl
+
+    def _queue_set(self, pipe, key: str, encoded_val: Any, exp: Union[timedelta, int]):
+        """Add the commands storing one value to `pipe`, honouring the compact layout"""
+        if self.compact is None:
+            pipe.set(key, encoded_val, ex=exp)
+            return
+        bucket, field = self.compact.locate(key)
+        if not self.compact.fits(encoded_val):
+            pipe.hdel(bucket, field)
+            pipe.set(key, encoded_val, ex=exp)
+            return
+        # Drop a larger value stored earlier as a string key, it would shadow
+        # this field once the field expires
+        pipe.unlink(key)
+        pipe.hset(bucket, field, self.compact.pack(encoded_val, exp))
+        if self._field_ttl_supported():
+            pipe.hexpire(bucket, exp, field)
+        else:
+            # The bucket lives as long as its longest-lived field
+            pipe.expire(bucket, exp, nx=True)
+            pipe.expire(bucket, exp, gt=True)
+
+    def _compact_fetch(self, keys, locations, read_policy: Optional[str] = None) -> List[Any]:
+        """Fetch `[field, string]` pairs for `keys`, flattened, in one pipeline"""
+        pipe = self.redis.pipeline(transaction=False)
+        for key, (bucket, field) in zip(keys, locations):
+            pipe.hget(bucket, field)
+            pipe.get(key)
+        return pipe.execute()
+
+    def _compact_get(self, keys: List[str], read_policy: Optional[str] = None) -> List[Any]:
+        """Read raw values for `keys` from their hash buckets or string keys"""
+        locations = [self.compact.locate(key) for key in keys]
+        raw = self._compact_fetch(keys, locations, read_policy)
+
+        values = []
+        expired = []
+        for i, location in enumerate(locations):
+            packed, plain = raw[2 * i], raw[2 * i + 1]
+            val = self.compact.unpack(packed)
+            if packed and val is None:
+                expired.append(location)
+            values.append(val if val is not None else plain)
+
+        if expired:
+            # Without HEXPIRE stale fields are only removed when they are read
+            pipe = self.redis.pipeline(transaction=False)
+            for bucket, field in expired:
+                pipe.hdel(bucket, field)
+            pipe.execute()
+        return values
+
+    def _set_fallback(self, key: str, encoded_val: Any, exp: Union[timedelta, int]):
+        """Store already encoded value in memory cache when Redis is unavailable"""
+        if self.fallback_to_memory:
+            try:
+                self._set_memory_cache(key, encoded_val, exp)
+                log.debug(f"Stored key '{key}' in memory cache (Redis unavailable)")
+            except Exception as mem_error:
+                log.error(f"Failed to store in memory cache: {mem_error}")
 
     def set_key(self, key, val, exp: Union[timedelta, int]):
         """Set key in Redis with fallback to memory cache"""
         encoded_val = self.encoder(val)
+        if self._preloaded:
+            self._preloaded.pop(key, None)
         
         # Try Redis first - Redis client handles reconnection automatically
         try:
-            self.redis.set(key, encoded_val, ex=exp)
+            if self.compact is None:
+                self.redis.set(key, encoded_val, ex=exp)
+            else:
+                pipe = self.redis.pipeline(transaction=False)
+                self._queue_set(pipe, key, encoded_val, exp)
+                pipe.execute()
         except (ConnectionError, TimeoutError, RedisError) as e:
             log.warning(f"Redis set_key failed: {e}")
             # Fallback to memory cache if enabled
-            if self.fallback_to_memory:
-                try:
-                    self._set_memory_cache(key, encoded_val, exp)
-                    log.debug(f"Stored key '{key}' in memory cache (Redis unavailable)")
-                except Exception as mem_error:
-                    log.error(f"Failed to store in memory cache: {mem_error}")
+            self._set_fallback(key, encoded_val, exp)
+
+    def set_many(self, items: List[Tuple[str, Any, Union[timedelta, int]]]):
+        """Set several `(key, val, exp)` items in one pipeline with fallback to memory cache"""
+        encoded = [(key, self.encoder(val), exp) for key, val, exp in items]
+        if self._preloaded:
+            for key, _, _ in encoded:
+                self._preloaded.pop(key, None)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, encoded_val, exp in encoded:
+                self._queue_set(pipe, key, encoded_val, exp)
+            pipe.execute()
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis set_many failed: {e}")
+            for key, encoded_val, exp in encoded:
+                self._set_fallback(key, encoded_val, exp)
+
+    def submit_set(self, key, val, exp: Union[timedelta, int]):
+        """Queue the write when write-behind is enabled, otherwise set it right away"""
+        if self.write_behind is None:
+            return self.set_key(key, val, exp)
+        self.write_behind.put(key, val, exp)
 
-    def get_key(self, key: str):
-        """Get key from Redis with fallback to memory cache"""
+    def get_key(self, key: str, read_policy: Optional[str] = None):
+        """Get key from Redis with fallback to memory cache
+
+        `read_policy` is only meaningful for cluster backends.
+        """
+        if self._preloaded:
+            val = self._get_preloaded(key)
+            if val is not None:
+                return val
         # Try Redis first - Redis client handles reconnection automatically
         try:
-            val = self.redis.get(key)
+            if self.compact is None:
+                val = self.redis.get(key)
+            else:
+                val = self._compact_get([key], read_policy)[0]
             if val:
                 return self.decoder(val)
         except (ConnectionError, TimeoutError, RedisError) as e:
             log.warning(f"Redis get_key failed: {e}")
-            # Fallback to memory cache if enabled
-            if self.fallback_to_memory:
-                try:
-                    encoded_val = self._get_memory_cache(key)
-                    if encoded_val:
-                        log.debug(f"Retrieved key '{key}' from memory cache (Redis unavailable)")
-                        return self.decoder(encoded_val)
-                except Exception as mem_error:
-                    log.error(f"Failed to retrieve from memory cache: {mem_error}")
-        
+            return self._get_fallback(key)
+
+        return None
+
+    def get_many(self, keys: List[str], read_policy: Optional[str] = None) -> List[Any]:
+        """Get several keys in one MGET, returning None for every missing key"""
+        if not keys:
+            return []
+        try:
+            if self.compact is None:
+                values = self.redis.mget(keys)
+            else:
+                values = self._compact_get(keys, read_policy)
+            return [self.decoder(val) if val else None for val in values]
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis get_many failed: {e}")
+            return [self._get_fallback(key) for key in keys]
+
+    def _get_fallback(self, key: str):
+        """Read key from memory cache when Redis is unavailable"""
+        if self.fallback_to_memory:
+            try:
+                encoded_val = self._get_memory_cache(key)
+                if encoded_val:
+                    log.debug(f"Retrieved key '{key}' from memory cache (Redis unavailable)")
+                    return self.decoder(encoded_val)
+            except Exception as mem_error:
+                log.error(f"Failed to retrieve from memory cache: {mem_error}")
         return None
 
+    def delete_key(self, key: str) -> bool:
+        """Remove a single key with UNLINK, also dropping any local copy"""
+        self._preloaded.pop(key, None)
+        self._memory_cache.pop(key)
+        try:
+            if self.compact is None:
+                return bool(self.redis.unlink(key))
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hdel(*self.compact.locate(key))
+            pipe.unlink(key)
+            return any(pipe.execute())
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis delete_key failed: {e}")
+            return False
+
+    @property
+    def scripts(self) -> Scripts:
+        """Lua scripts registered on this client, created on first use"""
+        if self._scripts is None:
+            if self.redis is None:
+                raise ConnectionError("Redis is not connected")
+            self._scripts = Scripts(self.redis)
+        return self._scripts
+
+    def _require_plain_keys(self, operation: str):
+        # The scripts read and write string keys; compact values live in hash
+        # fields of another slot, so they would miss or shadow them
+        if self.compact is not None:
+            raise CompactLayoutUnsupported(f"{operation} is not supported with the compact layout")
+
+    def get_or_lock(
+        self, key: str, lock_ttl: Union[timedelta, int] = DEFAULT_LOCK_TTL
+    ) -> Tuple[Any, Optional[str]]:
+        """Get the value or acquire its rebuild lock in one round trip
+
+        Returns `(value, None)` on a hit and `(None, token)` when the caller
+        acquired the lock and should rebuild, then `set_key` and
+        `release_lock(key, token)`. `(None, None)` means someone else holds
+        the lock (or Redis is unavailable).
+        """
+        self._require_plain_keys("get_or_lock")
+        token = uuid.uuid4().hex
+        try:
+            value, locked = self.scripts.get_or_lock(
+                keys=[key, companion_key(key, "lock")],
+                args=[token, _milliseconds(lock_ttl)],
+            )
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis get_or_lock failed: {e}")
+            return self._get_fallback(key), None
+        if value:
+            return self.decoder(value), None
+        return None, token if locked else None
+
+    def release_lock(self, key: str, token: str) -> bool:
+        """Release the rebuild lock if `token` still owns it"""
+        try:
+            return bool(
+                self.scripts.release_lock(keys=[companion_key(key, "lock")], args=[token])
+            )
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis release_lock failed: {e}")
+            return False
+
+    def get_generation(self, key: str) -> int:
+        """Current write generation of `key` (0 if it was never written with a generation)"""
+        try:
+            return int(self.redis.get(companion_key(key, "gen")) or 0)
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis get_generation failed: {e}")
+            return 0
+
+    def set_if_generation(
+        self, key: str, val: Any, exp: Union[timedelta, int], generation: int
+    ) -> Optional[int]:
+        """Set `key` only if its generation is still `generation`
+
+        Returns the new generation, or None if another writer got there first.
+        """
+        self._require_plain_keys("set_if_generation")
+        self._preloaded.pop(key, None)
+        try:
+            new_generation = self.scripts.set_if_generation(
+                keys=[key, companion_key(key, "gen")],
+                args=[generation, self.encoder(val), _milliseconds(exp)],
+            )
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis set_if_generation failed: {e}")
+            return None
+        return None if new_generation < 0 else new_generation
+
+    def get_and_touch(self, key: str, exp: Union[timedelta, int]):
+        """Get key and extend its TTL to `exp` in one round trip"""
+        self._require_plain_keys("get_and_touch")
+        try:
+            val = self.scripts.get_and_touch(keys=[key], args=[_milliseconds(exp)])
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis get_and_touch failed: {e}")
+            return self._get_fallback(key)
+        return self.decoder(val) if val else None
+
+    def preload(self, keys: List[str], ttl: Union[timedelta, int] = 60) -> int:
+        """Load a snapshot of hot keys into local memory with one MGET
+
+        Preloaded values are served without a Redis round trip for up to `ttl`
+        seconds. Returns the number of keys found.
+        """
+        expiry_time = time.time() + expire_seconds(ttl)
+        values = self.get_many(keys)
+        loaded = {key: (val, expiry_time) for key, val in zip(keys, values) if val is not None}
+        self._preloaded.update(loaded)
+        log.info(f"Preloaded {len(loaded)} of {len(keys)} keys into local memory")
+        return len(loaded)
+
+    def _get_preloaded(self, key: str) -> Optional[Any]:
+        entry = self._preloaded.get(key)
+        if entry is None:
+            return None
+        val, expiry_time = entry
+        if time.time() < expiry_time:
+            return val
+        self._preloaded.pop(key, None)
+        return None
+
+    def _forget_preloaded(self, pattern: str):
+        for key in [key for key in list(self._preloaded) if key.startswith(pattern)]:
+            self._preloaded.pop(key, None)
+
     @classmethod
     def get_instance(cls):
         if cls.instance:
@@ -132,32 +402,32 @@ class RedisCache:
         raise RedisNotInitialized("RedisCache", "You must initialize Redis before using the cache backend")
 
     @classmethod
-    def clear_keys(cls, pattern: str):
-        """Clear keys matching pattern, with error handling"""
-        if not cls.instance:
+    def clear_keys(cls, pattern: str, instance=None):
+        """Clear keys matching pattern, with error handling
+
+        Acts on the class-level instance unless a backend `instance` is given.
+        """
+        instance = instance or cls.instance
+        if not instance:
             log.warning("RedisCache instance not available")
             return False
-        
+
+        instance._forget_preloaded(pattern)
         ns_keys = f"{pattern}*"
         
         # Try Redis first - Redis client handles reconnection automatically
         try:
-            for key in cls.instance.redis.scan_iter(match=ns_keys):
+            for key in instance.redis.scan_iter(match=ns_keys):
                 if key:
-                    cls.instance.redis.delete(key)
+                    instance.redis.delete(key)
             return True
         except (ConnectionError, TimeoutError, RedisError) as e:
             log.warning(f"Redis clear_keys failed: {e}")
             # Fallback: clear from memory cache
-            if cls.instance.fallback_to_memory:
+            if instance.fallback_to_memory:
                 try:
-                    keys_to_delete = [
-                        key for key in cls.instance._memory_cache.keys()
-                        if key.startswith(pattern)
-                    ]
-                    for key in keys_to_delete:
-                        del cls.instance._memory_cache[key]
-                    log.debug(f"Cleared {len(keys_to_delete)} keys from memory cache")
+                    deleted = instance._memory_cache.delete_prefix(pattern)
+                    log.debug(f"Cleared {deleted} keys from memory cache")
                     return True
                 except Exception as mem_error:
                     log.error(f"Failed to clear memory cache: {mem_error}")
@@ -177,9 +447,16 @@ class RedisCache:
         key_prefix: str = DEFAULT_PREFIX,
         key_builder: Callable[..., Any] = key_builder,
         fallback_to_memory: bool = True,
+        write_behind: Union[bool, WriteBehindQueue] = False,
+        compact: Union[bool, CompactLayout] = False,
+        fallback_max_entries: Optional[int] = None,
         **kwargs,
     ):
-        if not cls.instance:
+        if cls.instance:
+            return
+        with cls._init_lock:
+            if cls.instance:
+                return
             cls(
                 host=host,
                 port=port,
@@ -191,5 +468,8 @@ class RedisCache:
                 key_prefix=key_prefix,
                 key_builder=key_builder,
                 fallback_to_memory=fallback_to_memory,
+                write_behind=write_behind,
+                compact=compact,
+                fallback_max_entries=fallback_max_entries,
                 **kwargs,
             )
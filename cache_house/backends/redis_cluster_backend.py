@@ -1,11 +1,18 @@
 import logging
 import os
-from typing import Any, Callable, Dict
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from redis.cluster import RedisCluster
+from redis.cluster import LoadBalancingStrategy, RedisCluster
 from redis.exceptions import ConnectionError, RedisError, TimeoutError
 
+from cache_house.backends.compact import CompactLayout
+from cache_house.backends.memory import StripedMemoryCache
+from cache_house.backends.read_policy import PRIMARY, NodeSelector
 from cache_house.backends.redis_backend import RedisCache
+from cache_house.backends.scripts import companion_key
+from cache_house.backends.write_behind import WriteBehindQueue
 from cache_house.helpers import (
     DEFAULT_NAMESPACE,
     DEFAULT_PREFIX,
@@ -18,9 +25,12 @@ LOG_LEVEL = os.getenv("CACHE_HOUSE_LOG_LEVEL", logging.INFO)
 log = logging.getLogger("cache_house.backends.redis_cluster_backend")
 log.setLevel(LOG_LEVEL)
 
+_RETRY_ERRORS = RedisCluster.ERRORS_ALLOW_RETRY
+
 
 class RedisClusterCache(RedisCache):
     instance = None
+    _init_lock = threading.Lock()
 
     def __init__(
         self,
@@ -39,6 +49,11 @@ class RedisClusterCache(RedisCache):
         key_prefix: str = DEFAULT_PREFIX,
         key_builder: Callable[..., Any] = key_builder,
         fallback_to_memory: bool = True,
+        read_policy: str = PRIMARY,
+        write_behind: Union[bool, WriteBehindQueue] = False,
+        compact: Union[bool, CompactLayout] = False,
+        fallback_max_entries: Optional[int] = None,
+        register_instance: bool = True,
         **kwargs,
     ) -> None:
         self.host = host
@@ -51,7 +66,20 @@ class RedisClusterCache(RedisCache):
         self.read_from_replicas = read_from_replicas
         self.url = url
         self.cluster_kwargs = kwargs
-        
+        self.read_policy = read_policy
+        self.node_selector = NodeSelector(read_policy)
+        # Replicas only serve reads over READONLY connections, which redis-py
+        # opens whenever a load balancing strategy is set. Cache reads below
+        # always name their target node, so the strategy only applies to
+        # commands issued on `self.redis` directly.
+        self.replica_reads = (
+            read_from_replicas
+            or read_policy != PRIMARY
+            or kwargs.get("load_balancing_strategy") is not None
+        )
+        if self.replica_reads:
+            kwargs.setdefault("load_balancing_strategy", LoadBalancingStrategy.ROUND_ROBIN)
+
         try:
             self.redis = RedisCluster(
                 host=host,
@@ -61,7 +89,6 @@ class RedisClusterCache(RedisCache):
                 require_full_coverage=require_full_coverage,
                 skip_full_coverage_check=skip_full_coverage_check,
                 reinitialize_steps=reinitialize_steps,
-                read_from_replicas=read_from_replicas,
                 url=url,
                 **kwargs,
             )
@@ -77,8 +104,13 @@ class RedisClusterCache(RedisCache):
         self.key_prefix = key_prefix
         self.key_builder = key_builder
         self.fallback_to_memory = fallback_to_memory
-        self._memory_cache: Dict[str, tuple] = {}  # key -> (value, expiry_time)
-        RedisClusterCache.instance = self
+        self._memory_cache = StripedMemoryCache(max_entries=fallback_max_entries)
+        self._preloaded: Dict[str, tuple] = {}  # key -> (decoded value, expiry_time)
+        self.compact = self._compact_layout(compact)
+        self._scripts = None
+        self.write_behind = self._start_write_behind(write_behind)
+        if register_instance:
+            RedisClusterCache.instance = self
 
     @classmethod
     def init(
@@ -97,9 +129,17 @@ class RedisClusterCache(RedisCache):
         namespace: str = DEFAULT_NAMESPACE,
         key_prefix: str = DEFAULT_PREFIX,
         key_builder: Callable[..., Any] = key_builder,
+        read_policy: str = PRIMARY,
+        write_behind: Union[bool, WriteBehindQueue] = False,
+        compact: Union[bool, CompactLayout] = False,
+        fallback_max_entries: Optional[int] = None,
         **kwargs,
     ):
-        if not cls.instance:
+        if cls.instance:
+            return
+        with cls._init_lock:
+            if cls.instance:
+                return
             cls(
                 host=host,
                 port=port,
@@ -115,28 +155,206 @@ class RedisClusterCache(RedisCache):
                 namespace=namespace,
                 key_prefix=key_prefix,
                 key_builder=key_builder,
+                read_policy=read_policy,
+                write_behind=write_behind,
+                compact=compact,
+                fallback_max_entries=fallback_max_entries,
                 **kwargs,
             )
 
+    def _timed_read(self, node, *args):
+        """Run a read command against `node` and feed its RTT into the selector"""
+        if node is None:
+            # Slot map not known yet, let redis-py route it
+            return self.redis.execute_command(*args)
+        started = time.perf_counter()
+        try:
+            result = self.redis.execute_command(*args, target_nodes=node)
+        except (ConnectionError, TimeoutError, RedisError):
+            self.node_selector.record_failure(node.name)
+            raise
+        self.node_selector.record(node.name, time.perf_counter() - started)
+        return result
+
+    def _effective_policy(self, read_policy: Optional[str]) -> str:
+        # Without READONLY connections a replica would answer MOVED, so
+        # per-call overrides are served by the primary
+        if not self.replica_reads:
+            return PRIMARY
+        return read_policy or self.read_policy
+
+    def _read_node(self, key: str, read_policy: str):
+        slot = self.redis.keyslot(key)
+        return self.node_selector.select(
+            self.redis.nodes_manager.slots_cache.get(slot, []), read_policy
+        )
+
+    def _routed_read(self, key: str, read_policy: str, *args):
+        """Read from the routed node, retrying on the primary if a replica fails"""
+        if read_policy != PRIMARY:
+            try:
+                return self._timed_read(self._read_node(key, read_policy), *args)
+            except (ConnectionError, TimeoutError, RedisError) as e:
+                log.warning(f"Redis cluster replica read failed: {e}. Retrying on primary.")
+        # redis-py does not retry commands sent to explicit target nodes, but
+        # it refreshes the slot map on failure, so pick the primary again
+        attempts = self.cluster_error_retry_attempts
+        while True:
+            try:
+                return self._timed_read(self._read_node(key, PRIMARY), *args)
+            except _RETRY_ERRORS:
+                if attempts <= 0:
+                    raise
+                attempts -= 1
+
+    def _pipelined_reads(self, commands: List[tuple], read_policy: str) -> List[Any]:
+        """Run `(key, args)` read commands with one pipeline per routed node"""
+        groups: Dict[str, Tuple[Any, List[int]]] = {}
+        for i, (key, _) in enumerate(commands):
+            node = self._read_node(key, read_policy)
+            name = node.name if node is not None else None
+            groups.setdefault(name, (node, []))[1].append(i)
+
+        results: List[Any] = [None] * len(commands)
+        for name, (node, indexes) in groups.items():
+            try:
+                values = self._node_pipeline(node, [commands[i][1] for i in indexes])
+            except (ConnectionError, TimeoutError, RedisError) as e:
+                log.warning(f"Redis cluster pipelined read failed: {e}. Retrying per key.")
+                values = None
+            if values is None:
+                # Single reads fall back to the primary and follow redirects
+                values = [
+                    self._routed_read(commands[i][0], read_policy, *commands[i][1])
+                    for i in indexes
+                ]
+            for i, value in zip(indexes, values):
+                results[i] = value
+        return results
+
+    def _node_pipeline(self, node, commands: List[tuple]) -> Optional[List[Any]]:
+        """Send `commands` to `node` in one pipeline and feed its RTT into the selector"""
+        if node is None:
+            # Slot map not known yet
+            return None
+        pipe = self.redis.get_redis_connection(node).pipeline(transaction=False)
+        for args in commands:
+            pipe.execute_command(*args)
+        started = time.perf_counter()
+        try:
+            values = pipe.execute()
+        except (ConnectionError, TimeoutError, RedisError):
+            self.node_selector.record_failure(node.name)
+            raise
+        self.node_selector.record(node.name, time.perf_counter() - started)
+        return values
+
+    def _compact_fetch(self, keys, locations, read_policy: Optional[str] = None) -> List[Any]:
+        if not self.replica_reads:
+            # Plain cluster pipelines route reads to primaries
+            return super()._compact_fetch(keys, locations)
+        # Cluster pipelines would load-balance these reads on their own, so
+        # group them by the node the policy picks and pipeline each group
+        commands = []
+        for key, (bucket, field) in zip(keys, locations):
+            commands.append((bucket, ("HGET", bucket, field)))
+            commands.append((key, ("GET", key)))
+        return self._pipelined_reads(commands, self._effective_policy(read_policy))
+
+    def get_key(self, key: str, read_policy: Optional[str] = None):
+        """Get key from the node chosen by the read policy, falling back to the primary"""
+        if self._preloaded:
+            val = self._get_preloaded(key)
+            if val is not None:
+                return val
+        if self.redis is None:
+            return self._get_fallback(key)
+        if self.compact is not None:
+            return super().get_key(key, read_policy)
+
+        try:
+            if self.replica_reads:
+                val = self._routed_read(key, self._effective_policy(read_policy), "GET", key)
+            else:
+                # Let redis-py route it, so MOVED, ASK and failover are retried
+                val = self.redis.get(key)
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis cluster get_key failed: {e}")
+            return self._get_fallback(key)
+        return self.decoder(val) if val else None
+
+    def get_many(self, keys: List[str], read_policy: Optional[str] = None) -> List[Any]:
+        """Get several keys, issuing one MGET per hash slot on the routed node"""
+        if not keys:
+            return []
+        if self.redis is None:
+            return [self._get_fallback(key) for key in keys]
+        if self.compact is not None:
+            return super().get_many(keys, read_policy)
+
+        if not self.replica_reads:
+            try:
+                values = self.redis.mget_nonatomic(keys)
+            except (ConnectionError, TimeoutError, RedisError) as e:
+                log.warning(f"Redis cluster get_many failed: {e}")
+                return [self._get_fallback(key) for key in keys]
+            return [self.decoder(val) if val else None for val in values]
+
+        read_policy = self._effective_policy(read_policy)
+        slots: Dict[int, List[str]] = {}
+        for key in keys:
+            slots.setdefault(self.redis.keyslot(key), []).append(key)
+
+        found: Dict[str, Any] = {}
+        for slot_keys in slots.values():
+            try:
+                values = self._routed_read(slot_keys[0], read_policy, "MGET", *slot_keys)
+            except (ConnectionError, TimeoutError, RedisError) as e:
+                log.warning(f"Redis cluster get_many failed: {e}")
+                found.update((key, self._get_fallback(key)) for key in slot_keys)
+                continue
+            found.update(
+                (key, self.decoder(val) if val else None)
+                for key, val in zip(slot_keys, values)
+            )
+        return [found.get(key) for key in keys]
+
+    def get_generation(self, key: str) -> int:
+        """Current write generation of `key`, always read from the primary"""
+        gen_key = companion_key(key, "gen")
+        try:
+            if self.replica_reads:
+                return int(self._routed_read(gen_key, PRIMARY, "GET", gen_key) or 0)
+            return int(self.redis.get(gen_key) or 0)
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            log.warning(f"Redis get_generation failed: {e}")
+            return 0
+
+    def delete_key(self, key: str) -> bool:
+        if self.redis is None:
+            self._preloaded.pop(key, None)
+            self._memory_cache.pop(key)
+            return False
+        return super().delete_key(key)
 
     @classmethod
-    def clear_keys(cls, pattern: str):
-        """Clear keys matching pattern, with error handling"""
-        if not cls.instance:
+    def clear_keys(cls, pattern: str, instance=None):
+        """Clear keys matching pattern, with error handling
+
+        Acts on the class-level instance unless a backend `instance` is given.
+        """
+        instance = instance or cls.instance
+        if not instance:
             log.warning("RedisClusterCache instance not available")
             return False
-        
-        if cls.instance.redis is None:
+
+        instance._forget_preloaded(pattern)
+        if instance.redis is None:
             # Fallback: clear from memory cache
-            if cls.instance.fallback_to_memory:
+            if instance.fallback_to_memory:
                 try:
-                    keys_to_delete = [
-                        key for key in cls.instance._memory_cache.keys()
-                        if key.startswith(pattern)
-                    ]
-                    for key in keys_to_delete:
-                        del cls.instance._memory_cache[key]
-                    log.debug(f"Cleared {len(keys_to_delete)} keys from memory cache")
+                    deleted = instance._memory_cache.delete_prefix(pattern)
+                    log.debug(f"Cleared {deleted} keys from memory cache")
                     return True
                 except Exception as mem_error:
                     log.error(f"Failed to clear memory cache: {mem_error}")
@@ -148,27 +366,22 @@ class RedisClusterCache(RedisCache):
         try:
             keys = []
             batch_size = 300
-            for key in cls.instance.redis.scan_iter(match=ns_keys, count=batch_size, target_nodes=RedisCluster.ALL_NODES):
+            for key in instance.redis.scan_iter(match=ns_keys, count=batch_size, target_nodes=RedisCluster.ALL_NODES):
                 log.info(key)
                 keys.append(key)
                 if len(keys) >= batch_size:
-                    cls.instance.redis.delete(*keys)
+                    instance.redis.delete(*keys)
                     keys = []
                 if len(keys) > 0:
-                    cls.instance.redis.delete(*keys)
+                    instance.redis.delete(*keys)
                     return True
         except (ConnectionError, TimeoutError, RedisError) as e:
             log.warning(f"Redis cluster clear_keys failed: {e}")
             # Fallback: clear from memory cache
-            if cls.instance.fallback_to_memory:
+            if instance.fallback_to_memory:
                 try:
-                    keys_to_delete = [
-                        key for key in cls.instance._memory_cache.keys()
-                        if key.startswith(pattern)
-                    ]
-                    for key in keys_to_delete:
-                        del cls.instance._memory_cache[key]
-                    log.debug(f"Cleared {len(keys_to_delete)} keys from memory cache")
+                    deleted = instance._memory_cache.delete_prefix(pattern)
+                    log.debug(f"Cleared {deleted} keys from memory cache")
                     return True
                 except Exception as mem_error:
                     log.error(f"Failed to clear memory cache: {mem_error}")
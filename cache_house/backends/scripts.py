@@ -0,0 +1,82 @@
+import re
+
+# Every script only touches keys sharing the hash slot of the cache key (see
+# `companion_key`), so they run unchanged against Redis Cluster.
+
+# KEYS: cache key, lock key. ARGV: lock token, lock ttl (ms).
+# Returns {value, 0} on a hit, {false, 1} when the caller now owns the
+# rebuild lock and {false, 0} when somebody else is already rebuilding.
+GET_OR_LOCK = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    return {value, 0}
+end
+if redis.call('SET', KEYS[2], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return {false, 1}
+end
+return {false, 0}
+"""
+
+# KEYS: lock key. ARGV: lock token. Deletes the lock only if we still own it.
+RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# KEYS: cache key, generation key. ARGV: expected generation, value, ttl (ms).
+# Writes the value and bumps the generation only if nobody wrote in between;
+# returns the new generation or -1 on conflict.
+SET_IF_GENERATION = """
+local current = redis.call('GET', KEYS[2]) or '0'
+if current ~= ARGV[1] then
+    return -1
+end
+redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+local generation = redis.call('INCR', KEYS[2])
+redis.call('PEXPIRE', KEYS[2], ARGV[3])
+return generation
+"""
+
+# KEYS: cache key. ARGV: ttl (ms). Returns the value and extends its TTL.
+GET_AND_TOUCH = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+return value
+"""
+
+_HASH_TAG = re.compile(r"\{[^}]+\}")
+
+
+def companion_key(key: str, suffix: str) -> str:
+    """Derive a key that always lands in the same cluster hash slot as `key`.
+
+    Keys that already carry a hash tag keep it; otherwise the whole key
+    becomes the tag, which hashes exactly like the untagged key.
+    """
+    if "{" in key:
+        match = _HASH_TAG.search(key)
+        if match is None or match.start() != key.index("{"):
+            # Redis only looks at the first "{"; without a valid tag there the
+            # whole key is hashed, which we cannot reproduce with a tag.
+            raise ValueError(f"Cannot derive a same-slot key for {key!r}")
+        return f"{key}:{suffix}"
+    return f"{{{key}}}:{suffix}"
+
+
+class Scripts:
+    """Lua scripts registered on one client.
+
+    redis-py's `Script` objects run through `EVALSHA`, cache the SHA and
+    transparently re-load the script when the server answers `NOSCRIPT`
+    (after a restart, failover or `SCRIPT FLUSH`).
+    """
+
+    def __init__(self, client) -> None:
+        self.get_or_lock = client.register_script(GET_OR_LOCK)
+        self.release_lock = client.register_script(RELEASE_LOCK)
+        self.set_if_generation = client.register_script(SET_IF_GENERATION)
+        self.get_and_touch = client.register_script(GET_AND_TOUCH)
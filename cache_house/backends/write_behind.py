@@ -0,0 +1,176 @@
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+LOG_LEVEL = os.getenv("CACHE_HOUSE_LOG_LEVEL", logging.INFO)
+log = logging.getLogger("cache_house.backends.write_behind")
+log.setLevel(LOG_LEVEL)
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+
+DROP_POLICIES = (DROP_NEWEST, DROP_OLDEST)
+
+
+class WriteBehindQueue:
+    """Bounded queue of pending cache writes drained by a background thread.
+
+    Callers enqueue `(key, val, exp)` and return immediately; the drain
+    thread groups pending writes into batches of up to `batch_size` and
+    hands them to the backend's `set_many`, which sends each batch as one
+    pipeline. When the queue is full, `drop_policy` decides whether the new
+    write (`"drop_newest"`) or the oldest pending one (`"drop_oldest"`) is
+    discarded. Losing a write only costs a future cache miss. Once the queue
+    is stopped, writes go straight to the backend instead.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        batch_size: int = 100,
+        drop_policy: str = DROP_NEWEST,
+        poll_interval: float = 0.05,
+    ) -> None:
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(
+                f"Unknown drop policy {drop_policy!r}, expected one of {DROP_POLICIES}"
+            )
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.drop_policy = drop_policy
+        self.poll_interval = poll_interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._backend = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._dropped_lock = threading.Lock()
+
+    def start(self, backend) -> None:
+        """Attach the backend and start the drain thread"""
+        self._backend = backend
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._drain, name="cache-house-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, key: str, val: Any, exp) -> bool:
+        """Enqueue a write without blocking. Returns False if it was dropped."""
+        if self._stopped.is_set() and self._backend is not None:
+            # Nothing drains the queue any more, write synchronously
+            self._backend.set_key(key, val, exp)
+            return True
+        try:
+            self._queue.put_nowait((key, val, exp))
+            return True
+        except queue.Full:
+            pass
+
+        with self._dropped_lock:
+            self.dropped += 1
+        if self.drop_policy == DROP_NEWEST:
+            log.debug(f"Write-behind queue full, dropped write for '{key}'")
+            return False
+
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait((key, val, exp))
+            return True
+        except queue.Full:
+            return False
+
+    def _next_batch(self, timeout: Optional[float]) -> List[Tuple[str, Any, Any]]:
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Tuple[str, Any, Any]]) -> None:
+        try:
+            self._backend.set_many(batch)
+        except Exception as e:
+            log.error(f"Write-behind batch of {len(batch)} writes failed: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _drain(self) -> None:
+        while not self._stopped.is_set():
+            batch = self._next_batch(self.poll_interval)
+            if batch:
+                self._write(batch)
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued write was sent. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self._thread is None or not self._thread.is_alive():
+            # No drain thread (never started or stopped), write from the caller
+            while self._backend is not None and self._remaining(deadline) != 0:
+                batch = self._next_batch(0)
+                if not batch:
+                    break
+                self._write(batch)
+            return self.pending() == 0
+
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = self._remaining(deadline)
+                if remaining == 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _discard(self) -> int:
+        discarded = 0
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            discarded += 1
+        if discarded:
+            with self._dropped_lock:
+                self.dropped += discarded
+        return discarded
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Flush pending writes within `timeout` and stop the drain thread
+
+        Writes still queued at the deadline are discarded and counted in
+        `dropped`. Returns False if any write was discarded.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.flush(timeout)
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(self._remaining(deadline))
+            if not self._thread.is_alive():
+                self._thread = None
+        if self._thread is None:
+            # Writes queued while the thread was shutting down
+            self.flush(self._remaining(deadline))
+        return self._discard() == 0
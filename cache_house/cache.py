@@ -1,49 +1,141 @@
 import inspect
 import logging
 import os
+import time
 from datetime import timedelta
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from typing import Any, Callable, Union
+from typing import Any, Callable, Dict, Iterable, Tuple, Union
 
+from cache_house.adaptive_ttl import AdaptiveTTL
 from cache_house.backends import RedisFactory
-from cache_house.helpers import DEFAULT_EXPIRE_TIME
+from cache_house.backends.read_policy import validate_read_policy
+from cache_house.helpers import (
+    DEFAULT_EXPIRE_TIME,
+    DEFAULT_XFETCH_BETA,
+    expire_seconds,
+    jittered_expire,
+    xfetch_pack,
+    xfetch_should_recompute,
+    xfetch_unpack,
+)
 
 LOG_LEVEL = os.getenv("CACHE_HOUSE_LOG_LEVEL", logging.INFO)
 log = logging.getLogger("cache_house.cache")
 log.setLevel(LOG_LEVEL)
 
+DEFAULT_WARM_CONCURRENCY = 8
+
+_bypass: ContextVar[bool] = ContextVar("cache_house_bypass", default=False)
+
+
+@contextmanager
+def bypass_cache():
+    """Skip cache reads and writes for decorated calls made inside this block.
+
+    The switch is context-local, so it only affects the current thread or
+    asyncio task.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _call_args(arg_set: Any) -> Tuple[tuple, Dict[str, Any]]:
+    """Turn a `warm` argument set into `(args, kwargs)`"""
+    if isinstance(arg_set, dict):
+        return (), arg_set
+    if isinstance(arg_set, (tuple, list)):
+        return tuple(arg_set), {}
+    return (arg_set,), {}
+
+
 def cache(
     expire: Union[timedelta, int] = DEFAULT_EXPIRE_TIME,
     namespace: str = None,
     key_prefix: str = None,
     key_builder: Callable[..., Any] = None,
     encoder: Callable[..., Any] = None,
-    decoder: Callable[..., Any] = None
+    decoder: Callable[..., Any] = None,
+    read_policy: str = None,
+    write_behind: bool = None,
+    early_recompute: bool = False,
+    beta: float = DEFAULT_XFETCH_BETA,
+    ttl_jitter: float = 0.0,
+    adaptive_ttl: AdaptiveTTL = None,
+    backend: str = None,
 ) -> Callable:
-    """Decorator for caching results"""
+    """Decorator for caching results
+
+    `read_policy` overrides the backend read routing for this function
+    (cluster backends only), e.g. `"round_robin"` to read from replicas.
+    `write_behind=False` forces a synchronous SET on a miss even when the
+    backend has write-behind enabled.
+    `early_recompute=True` enables probabilistic early expiration (XFetch):
+    hits occasionally recompute before the key expires, more often as the TTL
+    runs out and for slower functions (scaled by `beta`). `ttl_jitter` spreads
+    each TTL by up to that fraction.
+    `adaptive_ttl` scales `expire` per function (or per key) by observed
+    compute cost and access frequency, within the policy's bounds.
+    `backend` selects a named backend registered with
+    `RedisFactory.init(name=...)`; the default backend is used otherwise.
+
+    The returned function has `.warm(arg_sets, concurrency=8)` to populate the
+    cache ahead of time. Each argument set is a tuple of positional arguments,
+    a dict of keyword arguments, or a single argument. It also exposes
+    `.key_for(*args, **kwargs)`, `.peek(...)` (cached value or None, never
+    calls the function), `.refresh(...)` (recompute and overwrite) and
+    `.invalidate(...)` (UNLINK that single key).
+    """
+    if read_policy is not None:
+        # Fail when decorating rather than on every cached call
+        validate_read_policy(read_policy)
+
+    def lookup(cached_data, decoder):
+        """Return `(hit, value)` for data read from the cache"""
+        if early_recompute:
+            envelope = xfetch_unpack(cached_data)
+            if envelope is not None:
+                data, delta, expiry = envelope
+                if xfetch_should_recompute(delta, expiry, beta):
+                    log.debug("recompute before expiry")
+                    return False, None
+                return True, decoder(data)
+        return True, decoder(cached_data)
+
+    def store(cache_instance, key, val, delta, ttl):
+        ttl = jittered_expire(ttl, ttl_jitter)
+        if early_recompute:
+            val = xfetch_pack(val, delta, time.time() + expire_seconds(ttl))
+        if write_behind is False:
+            cache_instance.set_key(key, val, ttl)
+        else:
+            cache_instance.submit_set(key, val, ttl)
 
     cache_instance = None
 
     def cache_wrap(f: Callable[..., Any]):
+        function_name = f"{f.__module__}.{f.__qualname__}"
 
-        @wraps(f)
-        async def async_wrapper(*args, **kwargs):
+        def tracked_name(key):
+            """Name the adaptive TTL policy keeps stats under"""
+            return key if adaptive_ttl.per_key else function_name
+
+        def make_key(cache_instance, args, kwargs):
+            """Resolve per-backend defaults and build the key for this call"""
             nonlocal namespace
             nonlocal encoder
             nonlocal decoder
 
-            cache_instance = RedisFactory.get_instance()
-
-            if cache_instance is not None:
-                key_generator = key_builder or cache_instance.key_builder
-                namespace = namespace or cache_instance.namespace
-                prefix = key_prefix or cache_instance.key_prefix
-                encoder = encoder or cache_instance.encoder
-                decoder = decoder or cache_instance.decoder
-            if cache_instance is None:
-                return await f(*args, **kwargs)
-
-            key = key_generator(
+            key_generator = key_builder or cache_instance.key_builder
+            namespace = namespace or cache_instance.namespace
+            prefix = key_prefix or cache_instance.key_prefix
+            encoder = encoder or cache_instance.encoder
+            decoder = decoder or cache_instance.decoder
+            return key_generator(
                 f.__module__,
                 f.__name__,
                 args,
@@ -51,63 +143,150 @@ def cache(
                 namespace=namespace,
                 prefix=prefix,
             )
+
+        def save(cache_instance, key, result, delta, level=logging.DEBUG):
+            ttl = expire
+            if adaptive_ttl is not None:
+                name = tracked_name(key)
+                adaptive_ttl.observe_compute(name, delta)
+                ttl = adaptive_ttl.ttl(name, expire)
+            try:
+                store(cache_instance, key, encoder(result), delta, ttl)
+                log.log(level, "set result in cache")
+            except Exception as e:
+                log.warning(f"Error setting cache: {e}. Result returned without caching.")
+
+        @wraps(f)
+        async def async_wrapper(*args, **kwargs):
+            cache_instance = RedisFactory.get_instance(backend)
+            if cache_instance is None or _bypass.get():
+                return await f(*args, **kwargs)
+
+            key = make_key(cache_instance, args, kwargs)
+            if adaptive_ttl is not None:
+                adaptive_ttl.observe_access(tracked_name(key))
             try:
-                cached_data = cache_instance.get_key(key)
+                cached_data = cache_instance.get_key(key, read_policy=read_policy)
                 if cached_data:
                     log.debug("data exist in cache")
-                    log.debug("return data from cache")
-                    return decoder(cached_data)
+                    hit, value = lookup(cached_data, decoder)
+                    if hit:
+                        log.debug("return data from cache")
+                        return value
             except Exception as e:
                 log.warning(f"Error retrieving from cache: {e}. Proceeding without cache.")
-            
+
+            return await async_refresh_key(cache_instance, key, args, kwargs)
+
+        async def async_refresh_key(cache_instance, key, args, kwargs):
+            started = time.perf_counter()
             result = await f(*args, **kwargs)
-            try:
-                cache_instance.set_key(key, encoder(result), expire)
-                log.debug("set result in cache")
-            except Exception as e:
-                log.warning(f"Error setting cache: {e}. Result returned without caching.")
+            save(cache_instance, key, result, time.perf_counter() - started)
             return result
 
         @wraps(f)
         def wrapper(*args, **kwargs):
-            nonlocal namespace
-            nonlocal encoder
-            nonlocal decoder
-            
-            cache_instance = RedisFactory.get_instance()
-            if cache_instance is not None:
-                key_generator = key_builder or cache_instance.key_builder
-                namespace = namespace or cache_instance.namespace
-                prefix = key_prefix or cache_instance.key_prefix
-                encoder = encoder or cache_instance.encoder
-                decoder = decoder or cache_instance.decoder
-            if cache_instance is None:
+            cache_instance = RedisFactory.get_instance(backend)
+            if cache_instance is None or _bypass.get():
                 return f(*args, **kwargs)
-            key = key_generator(
-                f.__module__,
-                f.__name__,
-                args,
-                kwargs,
-                namespace=namespace,
-                prefix=prefix,
-            )
+
+            key = make_key(cache_instance, args, kwargs)
+            if adaptive_ttl is not None:
+                adaptive_ttl.observe_access(tracked_name(key))
             try:
-                cached_data = cache_instance.get_key(key)
+                cached_data = cache_instance.get_key(key, read_policy=read_policy)
                 if cached_data:
                     log.info("data exist in cache")
-                    log.info("return data from cache")
-                    return decoder(cached_data)
+                    hit, value = lookup(cached_data, decoder)
+                    if hit:
+                        log.info("return data from cache")
+                        return value
             except Exception as e:
                 log.warning(f"Error retrieving from cache: {e}. Proceeding without cache.")
-            
+
+            return refresh_key(cache_instance, key, args, kwargs)
+
+        def refresh_key(cache_instance, key, args, kwargs):
+            started = time.perf_counter()
             result = f(*args, **kwargs)
-            try:
-                cache_instance.set_key(key, encoder(result), expire)
-                log.info("set result in cache")
-            except Exception as e:
-                log.warning(f"Error setting cache: {e}. Result returned without caching.")
+            save(cache_instance, key, result, time.perf_counter() - started, logging.INFO)
             return result
 
+        def key_for(*args, **kwargs):
+            """Return the cache key for these arguments, or None if Redis is not initialized"""
+            cache_instance = RedisFactory.get_instance(backend)
+            if cache_instance is None:
+                return None
+            return make_key(cache_instance, args, kwargs)
+
+        def invalidate(*args, **kwargs) -> bool:
+            """Drop the cached entry for these arguments with a single UNLINK"""
+            cache_instance = RedisFactory.get_instance(backend)
+            if cache_instance is None:
+                return False
+            return cache_instance.delete_key(make_key(cache_instance, args, kwargs))
+
+        def peek(*args, **kwargs):
+            """Return the cached value for these arguments without calling the function"""
+            cache_instance = RedisFactory.get_instance(backend)
+            if cache_instance is None:
+                return None
+            cached_data = cache_instance.get_key(
+                make_key(cache_instance, args, kwargs), read_policy=read_policy
+            )
+            if not cached_data:
+                return None
+            envelope = xfetch_unpack(cached_data) if early_recompute else None
+            return decoder(envelope[0] if envelope else cached_data)
+
+        def refresh(*args, **kwargs):
+            """Call the function and overwrite the cached entry with its result"""
+            cache_instance = RedisFactory.get_instance(backend)
+            if cache_instance is None:
+                return f(*args, **kwargs)
+            return refresh_key(cache_instance, make_key(cache_instance, args, kwargs), args, kwargs)
+
+        async def async_refresh(*args, **kwargs):
+            """Await the function and overwrite the cached entry with its result"""
+            cache_instance = RedisFactory.get_instance(backend)
+            if cache_instance is None:
+                return await f(*args, **kwargs)
+            key = make_key(cache_instance, args, kwargs)
+            return await async_refresh_key(cache_instance, key, args, kwargs)
+
+        def warm(arg_sets: Iterable[Any], concurrency: int = DEFAULT_WARM_CONCURRENCY):
+            """Fetch or compute the entries for `arg_sets` in a thread pool"""
+            from concurrent.futures import ThreadPoolExecutor
+
+            calls = [_call_args(arg_set) for arg_set in arg_sets]
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                return list(pool.map(lambda call: wrapper(*call[0], **call[1]), calls))
+
+        async def async_warm(
+            arg_sets: Iterable[Any], concurrency: int = DEFAULT_WARM_CONCURRENCY
+        ):
+            """Fetch or compute the entries for `arg_sets` with at most `concurrency` in flight"""
+            import asyncio
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def warm_one(args, kwargs):
+                async with semaphore:
+                    return await async_wrapper(*args, **kwargs)
+
+            return await asyncio.gather(
+                *(warm_one(*_call_args(arg_set)) for arg_set in arg_sets)
+            )
+
+        for cached_fn in (wrapper, async_wrapper):
+            cached_fn.key_for = key_for
+            cached_fn.invalidate = invalidate
+            cached_fn.peek = peek
+        wrapper.warm = warm
+        wrapper.refresh = refresh
+        async_wrapper.warm = async_warm
+        async_wrapper.refresh = async_refresh
+
         return async_wrapper if inspect.iscoroutinefunction(f) else wrapper
 
     return cache_wrap
@@ -6,6 +6,10 @@ class RedisNotInitialized(CacheHouseError):
     """Raised when Redis backend is used before being initialized."""
 
 
+class CompactLayoutUnsupported(CacheHouseError):
+    """Raised when an operation cannot be used on a backend with the compact layout."""
+
+
 # Backwards compatibility alias (older versions exposed this name)
 RedisNotInitialize = RedisNotInitialized
 
@@ -1,11 +1,16 @@
 import hashlib
+import math
 import pickle
+import random
+import time
 from datetime import timedelta
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple, Union
 
 DEFAULT_EXPIRE_TIME = timedelta(seconds=180)
 DEFAULT_NAMESPACE = "main"
 DEFAULT_PREFIX = "cachehouse"
+DEFAULT_XFETCH_BETA = 1.0
+XFETCH_MARKER = "cachehouse:xfetch"
 
 
 def _normalize_args(args: Tuple[Any, ...]) -> Tuple[Any, ...]:
@@ -64,3 +69,47 @@ def pickle_encoder(data):
 
 def pickle_decoder(data):
     return pickle.loads(data)
+
+
+def expire_seconds(expire: Union[timedelta, int]) -> float:
+    if isinstance(expire, timedelta):
+        return expire.total_seconds()
+    return expire
+
+
+def jittered_expire(expire: Union[timedelta, int], jitter: float = 0.0) -> Union[timedelta, int]:
+    """Spread `expire` by up to +/- `jitter` (a fraction) so keys written together
+    do not all expire together."""
+    if not jitter:
+        return expire
+    seconds = expire_seconds(expire) * (1 + random.uniform(-jitter, jitter))
+    return max(1, int(seconds))
+
+
+def xfetch_pack(data: Any, delta: float, expiry: float) -> tuple:
+    """Wrap encoded data with its compute time and absolute expiry for XFetch"""
+    return (XFETCH_MARKER, data, delta, expiry)
+
+
+def xfetch_unpack(cached: Any) -> Optional[Tuple[Any, float, float]]:
+    """Return `(data, delta, expiry)` or None if `cached` was not written by XFetch"""
+    if isinstance(cached, (tuple, list)) and len(cached) == 4 and cached[0] == XFETCH_MARKER:
+        return cached[1], cached[2], cached[3]
+    return None
+
+
+def xfetch_should_recompute(
+    delta: float,
+    expiry: float,
+    beta: float = DEFAULT_XFETCH_BETA,
+    now: float = None,
+) -> bool:
+    """Probabilistic early expiration (XFetch).
+
+    Recompute when `now - delta * beta * log(rand()) >= expiry`: the closer the
+    key is to expiring and the longer it took to compute, the more likely a
+    caller refreshes it early, so recomputation is spread without locking.
+    """
+    now = time.time() if now is None else now
+    # 1 - random() lies in (0, 1], which keeps log() finite
+    return now - delta * beta * math.log(1.0 - random.random()) >= expiry
@@ -1,16 +1,42 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace
 from unittest.mock import patch
 
+import pytest
 from fakeredis import FakeRedis
+from redis.exceptions import ConnectionError as RedisConnectionError
 
 from cache_house import __version__
+from cache_house.adaptive_ttl import AdaptiveTTL
+from cache_house.backends import CLUSTER_MODE_ENV, RedisFactory
+from cache_house.backends.compact import CompactLayout
+from cache_house.backends.memory import StripedMemoryCache
+from cache_house.backends.read_policy import (
+    FAILURE_PENALTY,
+    LOWEST_LATENCY,
+    PRIMARY,
+    ROUND_ROBIN,
+    NodeSelector,
+)
 from cache_house.backends.redis_backend import RedisCache
 from cache_house.backends.redis_cluster_backend import RedisClusterCache
+from cache_house.backends.scripts import companion_key
+from cache_house.backends.write_behind import DROP_NEWEST, DROP_OLDEST, WriteBehindQueue
+from cache_house.cache import bypass_cache, cache
+from cache_house.exceptions import CompactLayoutUnsupported
 from cache_house.helpers import (
     DEFAULT_NAMESPACE,
     DEFAULT_PREFIX,
+    jittered_expire,
     key_builder,
     pickle_decoder,
     pickle_encoder,
+    xfetch_should_recompute,
 )
 
 
@@ -93,3 +119,589 @@ def test_redis_cluster_init_with_args():
     assert RedisClusterCache.instance.key_prefix == "pytest"
     assert RedisClusterCache.instance.namespace == "test"
     RedisClusterCache.instance = None
+
+
+class _Node:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_node_selector_round_robin_uses_replicas_only():
+    nodes = [_Node("primary"), _Node("replica-1"), _Node("replica-2")]
+    selector = NodeSelector(ROUND_ROBIN)
+    picked = [selector.select(nodes).name for _ in range(4)]
+    assert picked == ["replica-1", "replica-2", "replica-1", "replica-2"]
+    assert selector.select(nodes, PRIMARY).name == "primary"
+    assert selector.select(nodes[:1]).name == "primary"
+
+
+def test_node_selector_lowest_latency_follows_ewma():
+    nodes = [_Node("primary"), _Node("replica-1"), _Node("replica-2")]
+    selector = NodeSelector(LOWEST_LATENCY, alpha=0.5)
+    for node, rtt in zip(nodes, (0.010, 0.002, 0.004)):
+        assert selector.select(nodes) is node
+        selector.record(node.name, rtt)
+    assert selector.select(nodes).name == "replica-1"
+
+    selector.record_failure("replica-1")
+    assert selector.latency("replica-1") > selector.latency("replica-2")
+    assert selector.select(nodes).name == "replica-2"
+
+
+def test_node_selector_lowest_latency_recovers_after_failure():
+    nodes = [_Node("primary"), _Node("replica-1"), _Node("replica-2")]
+    rtts = {"primary": 0.010, "replica-1": 0.002, "replica-2": 0.004}
+    selector = NodeSelector(LOWEST_LATENCY, explore_interval=4)
+    for node in nodes:
+        selector.record(node.name, rtts[node.name])
+    selector.record_failure("replica-1")
+
+    picked = []
+    for _ in range(12):
+        node = selector.select(nodes)
+        picked.append(node.name)
+        selector.record(node.name, rtts[node.name])
+    # Every 4th read probes the stalest node; one good probe clears the penalty
+    assert picked[:8] == ["replica-2"] * 3 + ["primary"] + ["replica-2"] * 3 + ["replica-1"]
+    assert picked[8:11] == ["replica-1"] * 3
+    assert selector.latency("replica-1") == 0.002
+
+
+class _FakeCluster:
+    """Single-slot stand-in for RedisCluster that records which node serves each read"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.nodes_manager = SimpleNamespace(slots_cache={0: [_Node("primary"), _Node("replica")]})
+        self.data = {}
+        self.reads = []
+        self.failing = set()
+        self.flaky = None  # fails once, then recovers
+
+    def keyslot(self, key):
+        return 0
+
+    def execute_command(self, command, *args, target_nodes=None):
+        # Reads without target nodes are routed (and retried) by redis-py
+        name = target_nodes.name if target_nodes else None
+        self.reads.append((command, name))
+        if name in self.failing:
+            self.failing.discard(self.flaky)
+            raise RedisConnectionError("node down")
+        return self.lookup(command, *args)
+
+    def lookup(self, command, *args):
+        if command == "MGET":
+            return [self.data.get(key) for key in args]
+        if command == "HGET":
+            return self.data.get(args[0], {}).get(args[1])
+        return self.data.get(args[0])
+
+    def get_redis_connection(self, node):
+        return SimpleNamespace(pipeline=lambda transaction: _FakePipeline(self, node))
+
+    def get(self, key):
+        return self.execute_command("GET", key)
+
+    def mget_nonatomic(self, keys):
+        return self.execute_command("MGET", *keys)
+
+
+class _FakePipeline:
+    def __init__(self, cluster, node):
+        self.cluster, self.node, self.commands = cluster, node, []
+
+    def execute_command(self, *args):
+        self.commands.append(args)
+
+    def execute(self):
+        self.cluster.reads.append(("PIPELINE", self.node.name, len(self.commands)))
+        if self.node.name in self.cluster.failing:
+            raise RedisConnectionError("node down")
+        return [self.cluster.lookup(*args) for args in self.commands]
+
+
+@patch("cache_house.backends.redis_cluster_backend.RedisCluster", _FakeCluster)
+def test_redis_cluster_read_routing():
+    backend = RedisClusterCache(register_instance=False)
+    assert "load_balancing_strategy" not in backend.redis.kwargs
+    backend.redis.data["k"] = pickle_encoder("v")
+    # Without READONLY connections per-call overrides stay on the primary,
+    # through redis-py's own routing so its retries still apply
+    assert backend.get_key("k", read_policy=ROUND_ROBIN) == "v"
+    assert backend.get_many(["k"]) == ["v"]
+    assert backend.get_generation("k") == 0
+    assert backend.redis.reads == [("GET", None), ("MGET", None), ("GET", None)]
+
+    backend = RedisClusterCache(read_policy=ROUND_ROBIN, register_instance=False)
+    assert backend.redis.kwargs["load_balancing_strategy"] is not None
+    assert "read_from_replicas" not in backend.redis.kwargs
+    cluster = backend.redis
+    cluster.data.update(k=pickle_encoder("v"), k2=pickle_encoder("v2"))
+    assert backend.get_key("k") == "v"
+    assert backend.get_key("k", read_policy=PRIMARY) == "v"
+    assert backend.get_many(["k", "missing", "k2"]) == ["v", None, "v2"]
+    assert backend.get_many(["k"], read_policy=PRIMARY) == ["v"]
+    assert cluster.reads == [
+        ("GET", "replica"), ("GET", "primary"), ("MGET", "replica"), ("MGET", "primary"),
+    ]
+
+    cluster.reads.clear()
+    cluster.failing.add("replica")
+    assert backend.get_key("k") == "v"
+    assert backend.get_many(["k2"]) == ["v2"]
+    assert cluster.reads == [
+        ("GET", "replica"), ("GET", "primary"), ("MGET", "replica"), ("MGET", "primary"),
+    ]
+    assert backend.node_selector.latency("replica") == FAILURE_PENALTY
+
+    # Pinned primary reads are retried after a failover
+    cluster.reads.clear()
+    cluster.failing.add("primary")
+    cluster.flaky = "primary"
+    assert backend.get_key("k", read_policy=PRIMARY) == "v"
+    assert cluster.reads == [("GET", "primary"), ("GET", "primary")]
+
+
+def test_cache_rejects_unknown_read_policy():
+    with pytest.raises(ValueError):
+        cache(read_policy="round-robin")
+    assert cache(read_policy=ROUND_ROBIN)
+
+
+@patch("cache_house.backends.redis_cluster_backend.RedisCluster", _FakeCluster)
+def test_redis_cluster_compact_reads_are_pipelined_per_node():
+    backend = RedisClusterCache(read_policy=ROUND_ROBIN, compact=True, register_instance=False)
+    cluster = backend.redis
+    bucket, field = backend.compact.locate("small")
+    cluster.data[bucket] = {field: CompactLayout.pack(pickle_encoder(1), 60)}
+    cluster.data["large"] = pickle_encoder("x" * 200)
+
+    assert backend.get_many(["small", "large", "missing"]) == [1, "x" * 200, None]
+    assert cluster.reads == [("PIPELINE", "replica", 6)]
+
+    cluster.reads.clear()
+    cluster.failing.add("replica")
+    assert backend.get_key("small") == 1
+    assert cluster.reads[0] == ("PIPELINE", "replica", 2)
+    assert cluster.reads[-1] == ("GET", "primary")
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_redis_get_many():
+    RedisCache.init()
+    RedisCache.instance.set_key("k1", "v1", 60)
+    RedisCache.instance.set_key("k3", "v3", 60)
+    assert RedisCache.instance.get_many(["k1", "k2", "k3"]) == ["v1", None, "v3"]
+    assert RedisCache.instance.get_many([]) == []
+    RedisCache.instance.redis.flushall()
+    RedisCache.instance = None
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_write_behind_flushes_batched_writes():
+    RedisCache.init(write_behind=WriteBehindQueue(batch_size=2))
+    for i in range(5):
+        RedisCache.instance.submit_set(f"wb{i}", i, 60)
+    assert RedisCache.instance.write_behind.flush(timeout=5)
+    assert RedisCache.instance.get_many([f"wb{i}" for i in range(5)]) == [0, 1, 2, 3, 4]
+    assert RedisCache.instance.write_behind.stop(timeout=5)
+    # After close_connections stops the queue, writes go straight to Redis
+    RedisCache.instance.submit_set("after-stop", "v", 60)
+    assert RedisCache.instance.write_behind.pending() == 0
+    assert RedisCache.instance.get_key("after-stop") == "v"
+    RedisCache.instance.redis.flushall()
+    RedisCache.instance = None
+
+
+def test_write_behind_drop_policies():
+    newest = WriteBehindQueue(max_size=2, drop_policy=DROP_NEWEST)
+    oldest = WriteBehindQueue(max_size=2, drop_policy=DROP_OLDEST)
+    for i in range(3):
+        newest.put(f"k{i}", i, 60)
+        oldest.put(f"k{i}", i, 60)
+    assert newest.dropped == oldest.dropped == 1
+    assert [key for key, _, _ in newest._next_batch(0)] == ["k0", "k1"]
+    assert [key for key, _, _ in oldest._next_batch(0)] == ["k1", "k2"]
+
+
+def test_write_behind_stop_respects_timeout():
+    written = []
+
+    class SlowBackend:
+        def set_many(self, batch):
+            time.sleep(0.1)
+            written.extend(batch)
+
+    queue = WriteBehindQueue(batch_size=1)
+    queue.start(SlowBackend())
+    for i in range(20):
+        queue.put(f"k{i}", i, 60)
+    started = time.monotonic()
+    assert not queue.stop(timeout=0.3)
+    assert time.monotonic() - started < 1
+    time.sleep(0.2)  # let the in-flight batch finish
+    assert queue.pending() == 0
+    assert len(written) + queue.dropped == 20 and queue.dropped > 0
+
+    # Without pending writes a timeout is not reported as dropped writes
+    queue = WriteBehindQueue()
+    queue.start(SlowBackend())
+    assert queue.stop(timeout=0.3)
+
+
+def test_xfetch_recompute_probability_grows_near_expiry():
+    now = 1000.0
+    assert not xfetch_should_recompute(delta=0.001, expiry=now + 3600, now=now)
+    assert xfetch_should_recompute(delta=0.001, expiry=now, now=now)
+    with patch("cache_house.helpers.random.random", return_value=0.99):
+        assert xfetch_should_recompute(delta=10, expiry=now + 30, now=now)
+        assert not xfetch_should_recompute(delta=10, expiry=now + 30, beta=0.1, now=now)
+
+
+def test_jittered_expire_stays_in_bounds():
+    assert jittered_expire(60) == 60
+    for _ in range(100):
+        assert 45 <= jittered_expire(timedelta(seconds=60), 0.25) <= 75
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_cache_early_recompute_stores_envelope():
+    calls = []
+
+    @cache(expire=60, early_recompute=True)
+    def compute(a):
+        calls.append(a)
+        return a * 2
+
+    RedisFactory.instance = RedisCache()
+    assert compute(2) == 4
+    assert compute(2) == 4
+    assert calls == [2]
+    with patch("cache_house.cache.xfetch_should_recompute", return_value=True):
+        assert compute(2) == 4
+    assert calls == [2, 2]
+    RedisFactory.instance.redis.flushall()
+    RedisFactory.instance = RedisCache.instance = None
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_cache_warm_sync_and_async():
+    calls = []
+
+    @cache(expire=60)
+    def compute(a, b=0):
+        calls.append(a)
+        return a + b
+
+    @cache(expire=60)
+    async def async_compute(a):
+        calls.append(a)
+        return a * 10
+
+    RedisFactory.instance = RedisCache()
+    assert compute.warm([(1,), {"a": 2, "b": 3}, 4], concurrency=2) == [1, 5, 4]
+    assert asyncio.run(async_compute.warm([5, 6], concurrency=1)) == [50, 60]
+    assert compute(1) == 1
+    assert asyncio.run(async_compute(6)) == 60
+    assert sorted(calls) == [1, 2, 4, 5, 6]
+    RedisFactory.instance.redis.flushall()
+    RedisFactory.instance = RedisCache.instance = None
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_background_init_preloads_keys():
+    RedisCache().set_key("hot", "value", 60)
+    RedisCache.instance = None
+
+    RedisFactory.init(background=True, preload_keys=["hot", "cold"])
+    assert RedisFactory.wait_ready(timeout=5)
+    backend = RedisFactory.get_instance()
+    assert list(backend._preloaded) == ["hot"]
+    backend.redis.flushall()
+    assert backend.get_key("hot") == "value"
+
+    backend.set_key("hot", "fresh", 60)
+    assert backend.get_key("hot") == "fresh"
+    backend.redis.flushall()
+    RedisFactory.instance = RedisCache.instance = None
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_cache_call_controls():
+    calls = []
+
+    @cache(expire=60)
+    def compute(a):
+        calls.append(a)
+        return a + len(calls)
+
+    RedisFactory.instance = RedisCache()
+    assert compute.peek(1) is None
+    assert compute(1) == 2
+    assert compute.peek(1) == 2
+    assert compute.key_for(1) == key_builder(__name__, "compute", (1,), {})
+    assert compute.refresh(1) == 3
+    assert compute(1) == 3
+    assert compute.invalidate(1)
+    assert not compute.invalidate(1)
+    assert compute.peek(1) is None
+
+    with bypass_cache():
+        assert compute(1) == 4
+    assert compute.peek(1) is None
+    RedisFactory.instance.redis.flushall()
+    RedisFactory.instance = RedisCache.instance = None
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_compact_layout_stores_small_values_in_hashes():
+    RedisCache.init(compact=CompactLayout(buckets=4))
+    backend = RedisCache.instance
+    small_key = key_builder("mod", "fn", (1,), {})
+    large_key = key_builder("mod", "fn", (2,), {})
+    backend.set_key(small_key, 1, 60)
+    backend.set_key(large_key, "x" * 200, 60)
+
+    bucket, field = backend.compact.locate(small_key)
+    assert bucket.startswith(f"{DEFAULT_PREFIX}:{DEFAULT_NAMESPACE}::#")
+    assert backend.redis.type(bucket) == b"hash"
+    assert not backend.redis.exists(small_key)
+    assert backend.redis.httl(bucket, field)[0] > 0
+    assert backend.get_many([small_key, large_key]) == [1, "x" * 200]
+
+    # A value that shrinks into the hash must not leave its old string behind
+    backend.set_key(large_key, 2, 60)
+    assert not backend.redis.exists(large_key)
+    assert backend.get_key(large_key) == 2
+
+    assert backend.delete_key(small_key)
+    assert backend.get_key(small_key) is None
+    RedisCache.clear_keys(f"{DEFAULT_PREFIX}:{DEFAULT_NAMESPACE}")
+    assert backend.redis.dbsize() == 0
+    RedisCache.instance = None
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_compact_layout_without_field_ttl():
+    layout = CompactLayout()
+    layout.field_ttl = False
+    RedisCache.init(compact=layout)
+    backend = RedisCache.instance
+    backend.set_key("ns::a", "v", 60)
+    bucket, field = layout.locate("ns::a")
+    assert 0 < backend.redis.ttl(bucket) <= 60
+    assert backend.get_key("ns::a") == "v"
+
+    backend.redis.hset(bucket, field, layout.pack(backend.encoder("old"), -1))
+    assert backend.get_key("ns::a") is None
+    assert not backend.redis.hexists(bucket, field)
+    backend.redis.flushall()
+    RedisCache.instance = None
+
+
+def test_adaptive_ttl_favours_hot_and_expensive_entries():
+    policy = AdaptiveTTL(min_ttl=10, max_ttl=1000, per_key=True, max_tracked=2)
+    assert policy.ttl("unknown", 100) == 10
+
+    for i in range(5):
+        policy.observe_access("hot", now=i * 0.1)  # 10 req/s
+        policy.observe_access("cold", now=i * 100.0)  # 0.01 req/s
+    policy.observe_compute("hot", 1.0)
+    policy.observe_compute("cold", 0.001)
+    assert policy.ttl("hot", 100) == 1000
+    assert policy.ttl("cold", 100) == 10
+
+    policy.observe_access("other")
+    assert "hot" not in policy._stats
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_cache_uses_adaptive_ttl():
+    policy = AdaptiveTTL(min_ttl=5, max_ttl=50)
+
+    @cache(expire=20, adaptive_ttl=policy)
+    def compute(a):
+        return a
+
+    RedisFactory.instance = RedisCache()
+    compute(1)
+    assert RedisFactory.instance.redis.ttl(compute.key_for(1)) == 5
+    RedisFactory.instance.redis.flushall()
+    RedisFactory.instance = RedisCache.instance = None
+
+
+def test_companion_key_keeps_hash_slot():
+    assert companion_key("cachehouse:main::abc", "lock") == "{cachehouse:main::abc}:lock"
+    assert companion_key("user:{42}:profile", "gen") == "user:{42}:profile:gen"
+    with pytest.raises(ValueError):
+        companion_key("odd:{}:{42}", "lock")
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_lua_scripts():
+    pytest.importorskip("lupa")
+    RedisCache.init()
+    backend = RedisCache.instance
+
+    value, token = backend.get_or_lock("scripted")
+    assert value is None and token
+    assert backend.get_or_lock("scripted") == (None, None)
+    assert not backend.release_lock("scripted", "someone-else")
+    assert backend.release_lock("scripted", token)
+
+    assert backend.get_generation("scripted") == 0
+    assert backend.set_if_generation("scripted", "v1", 60, 0) == 1
+    assert backend.set_if_generation("scripted", "stale", 60, 0) is None
+    assert backend.get_or_lock("scripted") == ("v1", None)
+
+    backend.redis.expire("scripted", 5)
+    assert backend.get_and_touch("scripted", 60) == "v1"
+    assert backend.redis.ttl("scripted") == 60
+
+    backend.redis.script_flush()
+    assert backend.get_and_touch("scripted", 60) == "v1"
+
+    # Sub-second TTLs are sent in milliseconds instead of rounding down to 0
+    short = timedelta(milliseconds=500)
+    assert backend.get_and_touch("scripted", short) == "v1"
+    assert 0 < backend.redis.pttl("scripted") <= 500
+    assert backend.set_if_generation("scripted", "v2", short, 1) == 2
+    assert 0 < backend.redis.pttl("scripted") <= 500
+    backend.redis.flushall()
+    RedisCache.instance = None
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_lua_scripts_reject_compact_layout():
+    backend = RedisCache(compact=True, register_instance=False)
+    for call in (
+        lambda: backend.get_or_lock("k"),
+        lambda: backend.set_if_generation("k", "v", 60, 0),
+        lambda: backend.get_and_touch("k", 60),
+    ):
+        with pytest.raises(CompactLayoutUnsupported):
+            call()
+    backend.redis.flushall()
+
+
+def _run_threads(target, count=8):
+    errors = []
+
+    def run(worker):
+        try:
+            target(worker)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_striped_memory_cache_concurrent_access():
+    # Also meant to run on free-threaded CPython (3.13t), where these races
+    # are not hidden by the GIL.
+    store = StripedMemoryCache(stripes=4, cleanup_threshold=64)
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        def work(worker):
+            for i in range(2000):
+                key = f"k{worker}:{i % 200}"
+                store.set(key, i, -1 if i % 3 == 0 else 60)
+                store.get(key)
+                if i % 50 == 0:
+                    store.cleanup()
+                if i % 500 == 0:
+                    store.delete_prefix(f"k{(worker + 1) % 8}:")
+                store.pop(f"k{worker}:{(i + 7) % 200}")
+
+        _run_threads(work)
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert store.get("missing") is None
+    store.set("kept", 1, 60)
+    assert store.get("kept") == 1 and "kept" in store
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_factory_init_is_race_free():
+    created = []
+    original_init = RedisCache.__init__
+
+    def counting_init(self, *args, **kwargs):
+        created.append(self)
+        original_init(self, *args, **kwargs)
+
+    barrier = threading.Barrier(8)
+    with patch.object(RedisCache, "__init__", counting_init):
+        _run_threads(lambda worker: (barrier.wait(), RedisFactory.init()))
+    assert len(created) == 1
+    RedisFactory.instance = RedisCache.instance = None
+
+
+def test_import_does_not_load_redis():
+    code = "import sys, cache_house.cache; print('redis' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "False"
+
+
+def test_cluster_detection_hints(tmp_path, monkeypatch):
+    hint_file = str(tmp_path / "cluster-hint.json")
+    monkeypatch.delenv(CLUSTER_MODE_ENV, raising=False)
+    with patch.object(RedisFactory, "_probe_cluster", return_value=False) as probe:
+        assert not RedisFactory._detect_cluster("redis-a", 6379, None, 0, hint_file)
+        assert not RedisFactory._detect_cluster("redis-a", 6379, None, 0, hint_file)
+        assert probe.call_count == 1
+
+    monkeypatch.setenv(CLUSTER_MODE_ENV, "cluster")
+    with patch.object(RedisFactory, "_probe_cluster") as probe:
+        assert RedisFactory._detect_cluster("redis-a", 6379, None, 0, hint_file)
+        probe.assert_not_called()
+
+
+@patch("cache_house.backends.redis_backend.Redis", FakeRedis)
+def test_named_backends_are_independent():
+    RedisFactory.init(db=0)
+    RedisFactory.init(name="sessions", db=1, fallback_max_entries=32)
+    default, sessions = RedisFactory.get_instance(), RedisFactory.get_instance("sessions")
+    assert sessions is not default and RedisCache.instance is default
+    assert RedisFactory.backends() == {"default": default, "sessions": sessions}
+    assert RedisFactory.get_instance("missing") is None
+
+    @cache(expire=60, backend="sessions")
+    def session_value(x):
+        return x * 2
+
+    @cache(expire=60)
+    def default_value(x):
+        return x * 3
+
+    assert session_value(2) == 4 and default_value(2) == 6
+    assert sessions.redis.exists(session_value.key_for(2))
+    assert not default.redis.exists(session_value.key_for(2))
+    assert default.redis.exists(default_value.key_for(2))
+
+    assert RedisFactory.clear_keys(f"{session_value.key_for(2)}*", name="sessions")
+    assert not sessions.redis.exists(session_value.key_for(2))
+    assert default.redis.exists(default_value.key_for(2))
+    RedisFactory.close_connections()
+    RedisFactory.instance = RedisCache.instance = None
+    RedisFactory._backends.clear()
+
+
+def test_memory_cache_max_entries_evicts_oldest():
+    store = StripedMemoryCache(stripes=1, max_entries=3)
+    for key in ("a", "b", "c"):
+        store.set(key, key, 60)
+    store.set("a", "a2", 60)
+    store.set("d", "d", 60)
+    assert len(store) == 3
+    assert store.get("b") is None
+    assert store.get("a") == "a2" and store.get("d") == "d"